@@ -3,6 +3,13 @@ ASGI config for instander project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The download views are coroutines, so serve this module with an ASGI
+server (e.g. ``gunicorn instander.asgi:application -k
+uvicorn.workers.UvicornWorker``) to let one process hold many in-flight
+Instagram fetches instead of pinning a thread per request. The media proxy
+views (proxy_image, proxy_download) only stream asynchronously here; under
+WSGI they fall back to their thread-based versions.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
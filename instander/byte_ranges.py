@@ -0,0 +1,74 @@
+import re
+from typing import AsyncIterator, BinaryIO, Iterator, Optional, Tuple
+from asgiref.sync import sync_to_async
+
+# Only a single range is supported; for anything else a full 200 is always a valid answer
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+class RangeNotSatisfiable(ValueError):
+    """The requested range starts past the end of the body"""
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) for a `Range: bytes=...` header against a body
+    of `size` bytes. None means the header should be ignored and the whole
+    body served (absent, malformed, multiple ranges or another unit).
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if not last:
+            return None
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, min(int(last), size - 1) if last else size - 1
+
+def if_range_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Whether a Range still applies under If-Range. Only our own strong ETag
+    matches; dates and other validators fall back to the full body.
+    """
+    return not header or header.strip() == etag
+
+def iter_file_range(file: BinaryIO, start: int, end: int, chunk_size: int = 65536) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of an open file, closing it when done"""
+    try:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+async def aiter_file_range(file: BinaryIO, start: int, end: int, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+    """Async iter_file_range; each read runs in a worker thread so no thread waits on a slow client"""
+    read = sync_to_async(file.read, thread_sensitive=False)
+    try:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
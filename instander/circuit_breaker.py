@@ -0,0 +1,88 @@
+import time
+from typing import Dict, Optional
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one Instagram account. A closed circuit serves
+    requests; failures open it for a cooldown that depends on what went
+    wrong and doubles each time it re-opens. When the cooldown has passed
+    a background probe half-opens it and either closes it again or re-opens it.
+    Not thread-safe: the session manager calls it under its own lock.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # Failure kinds
+    RATE_LIMITED = "rate_limited"
+    LOGIN_REQUIRED = "login_required"
+    TRANSIENT = "transient"
+
+    # (first cooldown, longest cooldown) in seconds
+    COOLDOWNS = {
+        RATE_LIMITED: (600, 3600),
+        LOGIN_REQUIRED: (60, 3600),
+        TRANSIENT: (30, 900),
+    }
+
+    def __init__(self, failure_threshold: int = 3):
+        # Transient errors (timeouts, 5xx) only open the circuit when consecutive
+        self.failure_threshold = failure_threshold
+        self.state = self.CLOSED
+        self.reason = None
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.reason = None
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+
+    def record_failure(self, kind: str):
+        if self.state == self.OPEN:
+            return  # late report from a request that started before the circuit opened
+        self.failures += 1
+        if kind == self.TRANSIENT and self.state == self.CLOSED and self.failures < self.failure_threshold:
+            return
+        self.trip(kind)
+
+    def trip(self, kind: str, until: Optional[float] = None):
+        """Open the circuit for the kind's (growing) cooldown, or until a given time"""
+        first, longest = self.COOLDOWNS[kind]
+        cooldown = min(longest, first * 2 ** self.trips)
+        self.trips += 1
+        self.state = self.OPEN
+        self.reason = kind
+        self.open_until = until or time.time() + cooldown
+
+    def probe_due(self, now: Optional[float] = None) -> bool:
+        return self.state == self.OPEN and (now or time.time()) >= self.open_until
+
+    def half_open(self):
+        self.state = self.HALF_OPEN
+
+    def expedite(self):
+        """Cut an open circuit's cooldown short so the next probe pass picks it up"""
+        if self.state == self.OPEN:
+            self.open_until = time.time()
+
+    def postpone(self, until: float):
+        """Back to open without counting a failure (the probe couldn't run yet)"""
+        self.state = self.OPEN
+        self.open_until = until
+
+    def to_dict(self) -> Dict:
+        return {
+            'state': self.state,
+            'reason': self.reason,
+            'failures': self.failures,
+            'retry_in': max(0, round(self.open_until - time.time())) if self.state == self.OPEN else 0,
+        }
@@ -0,0 +1,54 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Optional
+from .exceptions import DeadlineExceeded
+
+class Deadline:
+    """
+    A request's overall time budget, created at the view and passed down
+    explicitly. Layers cap their own timeouts with it and fail early with
+    DeadlineExceeded instead of starting work that can't finish in time.
+    Deadline() without a budget never expires.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, what: str = "request"):
+        if self.expired:
+            raise DeadlineExceeded(what, self)
+
+    def cap(self, timeout: float, what: str = "request") -> float:
+        """A step's own timeout, shortened to what's left of the budget"""
+        self.check(what)
+        return min(timeout, self.remaining())
+
+    async def sleep(self, seconds: float, what: str = "retry"):
+        """Sleep, unless the budget can't cover the sleep - then fail now"""
+        if seconds >= self.remaining():
+            raise DeadlineExceeded(what, self)
+        await asyncio.sleep(seconds)
+
+    async def wait_for(self, awaitable: Awaitable, what: str = "request") -> Any:
+        """Await something within the remaining budget"""
+        if self.expires_at is None:
+            return await awaitable
+        if self.expired:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded(what, self)
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError as e:
+            if isinstance(e, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded(what, self)
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import logging
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows - eviction isn't coordinated between processes
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Query parameters that select different bytes on Meta's CDNs; everything
+# else (signature, expiry, edge routing hints) changes between links to the same file
+CDN_IDENTITY_PARAMS = ("stp",)
+CDN_HOSTS = ("cdninstagram.com", "fbcdn.net")
+
+def canonical_media_id(url: str, variant: str = "") -> str:
+    """
+    Identity of the bytes behind a media URL. Instagram/Facebook CDN links
+    for the same file differ in edge host, signature and expiry, so only
+    the path and the parameters that pick a rendition are kept.
+    """
+    parsed = urlparse(url)
+    host = parsed.hostname or ""
+    # Whole labels only: evilcdninstagram.com must not share keys with the real CDN
+    if any(host == suffix or host.endswith("." + suffix) for suffix in CDN_HOSTS):
+        params = parse_qs(parsed.query)
+        selected = "&".join(f"{name}={params[name][0]}" for name in CDN_IDENTITY_PARAMS if name in params)
+        identity = f"meta-cdn:{parsed.path}?{selected}"
+    else:
+        identity = f"{host}{parsed.path}?{parsed.query}"
+    if variant:
+        identity = f"{identity}#{variant}"
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+class CacheWriter:
+    """Streams one entry into a temp file; nothing is visible until commit()"""
+
+    def __init__(self, cache: "DiskMediaCache", key: str, content_type: str):
+        self.cache = cache
+        self.key = key
+        self.content_type = content_type
+        self.size = 0
+        self.failed = False
+        os.makedirs(os.path.dirname(cache._data_path(key)), exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache._data_path(key)), prefix=".tmp-")
+        self.file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        if self.failed:
+            return
+        self.size += len(chunk)
+        if self.size > self.cache.max_entry_bytes:
+            # Too big to be worth caching; keep streaming without it
+            self.abort()
+            return
+        try:
+            self.file.write(chunk)
+        except OSError as e:
+            logger.warning(f"Media cache write failed: {e}")
+            self.abort()
+
+    def commit(self) -> Optional[str]:
+        """Publish the entry atomically; returns its data path"""
+        if self.failed:
+            return None
+        self.file.close()
+        data_path = self.cache._data_path(self.key)
+        try:
+            os.replace(self.tmp_path, data_path)
+            self.cache._write_meta(self.key, {'content_type': self.content_type, 'size': self.size})
+        except OSError as e:
+            logger.warning(f"Media cache commit failed: {e}")
+            return None
+        self.cache._account(self.size)
+        return data_path
+
+    def abort(self):
+        self.failed = True
+        try:
+            self.file.close()
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+class DiskMediaCache:
+    """
+    Content-addressed media cache on local disk, shared by every worker.
+    Entries are a data file plus a small .meta file, each written to a temp
+    file and renamed into place, so readers never see a partial entry. A
+    hit refreshes the meta file's mtime; when the cache grows past
+    max_bytes the least recently used entries are evicted under a file lock.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_entry_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.lock = threading.Lock()
+        # Bytes written since the last eviction scan (per process)
+        self.written = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _data_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _meta_path(self, key: str) -> str:
+        return self._data_path(key) + ".meta"
+
+    def _write_meta(self, key: str, meta: Dict):
+        meta_path = self._meta_path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(meta_path), prefix=".tmp-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict]]:
+        """(data path, meta) for a cached entry, marking it recently used"""
+        meta_path = self._meta_path(key)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            os.utime(meta_path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self.lock:
+                self.stats['misses'] += 1
+            return None
+
+        data_path = self._data_path(key)
+        if not os.path.exists(data_path):
+            with self.lock:
+                self.stats['misses'] += 1
+            return None
+        with self.lock:
+            self.stats['hits'] += 1
+        return data_path, meta
+
+    def writer(self, key: str, content_type: str) -> CacheWriter:
+        return CacheWriter(self, key, content_type)
+
+    def put(self, key: str, content: bytes, content_type: str) -> Optional[str]:
+        """Store a whole body at once"""
+        writer = self.writer(key, content_type)
+        writer.write(content)
+        return writer.commit()
+
+    def _account(self, size: int):
+        with self.lock:
+            self.stats['stores'] += 1
+            self.written += size
+            # A full scan is only worth it once we may have grown noticeably
+            if self.written < self.max_bytes // 20:
+                return
+            self.written = 0
+        try:
+            self.evict()
+        except OSError as e:
+            logger.warning(f"Media cache eviction failed: {e}")
+
+    def evict(self):
+        """Delete least recently used entries until the cache is back under 90% of max_bytes"""
+        lock_file = open(os.path.join(self.directory, ".evict.lock"), "a")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            entries = []
+            total = 0
+            for shard in os.listdir(self.directory):
+                shard_dir = os.path.join(self.directory, shard)
+                if not os.path.isdir(shard_dir):
+                    continue
+                for name in os.listdir(shard_dir):
+                    path = os.path.join(shard_dir, name)
+                    if name.endswith(".meta"):
+                        try:
+                            used_at = os.path.getmtime(path)
+                            size = os.path.getsize(path[:-len(".meta")])
+                        except FileNotFoundError:
+                            continue
+                        entries.append((used_at, size, path[:-len(".meta")]))
+                        total += size
+                    elif name.startswith(".tmp-"):
+                        try:
+                            if time.time() - os.path.getmtime(path) > 3600:
+                                os.remove(path)  # left behind by a crashed writer
+                        except FileNotFoundError:
+                            pass
+
+            if total <= self.max_bytes:
+                return
+
+            evicted = 0
+            for used_at, size, data_path in sorted(entries):
+                if total <= self.max_bytes * 0.9:
+                    break
+                for path in (data_path + ".meta", data_path):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+                evicted += 1
+
+            with self.lock:
+                self.stats['evictions'] += evicted
+            logger.info(f"Evicted {evicted} media cache entries ({total / 1024 / 1024:.0f} MB left)")
+        finally:
+            lock_file.close()
+
+    def usage(self) -> Dict:
+        with self.lock:
+            return {**self.stats, 'max_bytes': self.max_bytes}
+
+# Global instance
+disk_cache = DiskMediaCache(
+    str(getattr(settings, "MEDIA_FILE_CACHE_DIR", os.path.join(settings.BASE_DIR, "media_cache"))),
+    max_bytes=getattr(settings, "MEDIA_FILE_CACHE_MAX_BYTES", 2 * 1024 ** 3),
+    max_entry_bytes=getattr(settings, "MEDIA_FILE_CACHE_MAX_ENTRY_BYTES", 200 * 1024 ** 2),
+)
@@ -1,23 +1,75 @@
 import re
 import os
-import json
-import subprocess
+import asyncio
+import functools
 import instaloader
 import logging
 import time
 import random
-from typing import List, Dict, Optional
-from .insta_login import get_session_manager, get_instagram_session_with_tracking
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+from typing import List, Dict, Optional, Tuple
+from .insta_login import get_session_manager, acquire_instagram_session, classify_failure, is_missing_post, CHECKOUT_TIMEOUT
+from .circuit_breaker import CircuitBreaker
+from .media_cache import media_cache, negative_cache, facebook_link_cache, media_cache_timeout, NEGATIVE_TIMEOUT
+from .exceptions import MediaUnavailableError, SessionBusyError, DeadlineExceeded
+from .deadline import Deadline
+from .media_store import load_media, save_media, delete_media, schedule_refresh
+from .singleflight import SingleFlight
+from .ytdlp_pool import YtDlpPool
+from .hedging import HedgePolicy
+from .disk_cache import disk_cache
+from .http_client import media_http, async_media_http
 from django.conf import settings
-from django.core.cache import cache
+from asgiref.sync import async_to_sync
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Configuration
-CACHE_TIMEOUT = 300  # 5 minutes cache for media URLs
 MAX_RETRIES = 3
 RETRY_DELAY = 5
+FACEBOOK_TIMEOUT = 60
+FACEBOOK_LINK_TIMEOUT = 10
+FACEBOOK_LINK_MAPPING_TTL = 30 * 24 * 3600  # short link -> video id mappings don't change
+
+# Only one upstream fetch per shortcode / video id is in flight at a time
+instagram_flight = SingleFlight("instagram")
+facebook_flight = SingleFlight("facebook", lock_timeout=FACEBOOK_TIMEOUT + 30)
+
+# Optional hedging: a post fetch slower than the latency percentile gets a
+# second attempt on another account, within a budget of extra requests
+HEDGE_ENABLED = getattr(settings, "INSTAGRAM_HEDGE_ENABLED", False)
+instagram_hedge = HedgePolicy(
+    "instagram",
+    percentile=getattr(settings, "INSTAGRAM_HEDGE_PERCENTILE", 95),
+    budget_percent=getattr(settings, "INSTAGRAM_HEDGE_BUDGET_PERCENT", 10),
+)
+
+# Warm yt-dlp worker processes for Facebook extraction
+ytdlp_pool = YtDlpPool(
+    size=getattr(settings, "YTDLP_POOL_SIZE", 2),
+    max_jobs=getattr(settings, "YTDLP_POOL_MAX_JOBS", 200),
+    options={
+        'quiet': True,
+        'no_warnings': True,
+        'noplaylist': True,
+        'socket_timeout': 30,
+        'retries': 3,
+    },
+)
+
+# Bounded pool for blocking instaloader calls
+_instaloader_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "INSTALOADER_MAX_WORKERS", 16),
+    thread_name_prefix="instaloader",
+)
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking instaloader call in the bounded executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_instaloader_executor, functools.partial(func, *args, **kwargs))
 
 # --- URL Validation ---
 def is_instagram_url(url: str) -> bool:
@@ -63,24 +115,144 @@ def detect_content_type(url: str) -> str:
 
 def extract_shortcode(url: str) -> Optional[str]:
     """Extract shortcode from Instagram URL"""
-    shortcode_match = re.search(r"/(p|reel|tv)/([a-zA-Z0-9_-]+)", url)
+    shortcode_match = re.search(r"/(p|reels?|tv)/([a-zA-Z0-9_-]+)", url)
     return shortcode_match.group(2) if shortcode_match else None
 
+def extract_facebook_video_id(url: str) -> Optional[str]:
+    """Extract the numeric video id from a Facebook video/watch/reel URL"""
+    video_id_match = re.search(r"(?:/videos/(?:[^/?#]+/)?|/reel/|[?&]v=)(\d+)", url)
+    return video_id_match.group(1) if video_id_match else None
+
+def media_cache_key(url: str) -> Optional[str]:
+    """
+    Canonical cache key for a post. Keyed on the shortcode so query strings,
+    /reel/ vs /p/ and m./www. hosts all share one entry across workers.
+    """
+    shortcode = extract_shortcode(url)
+    return f"ig:{shortcode}" if shortcode else None
+
+def download_key(url: str) -> str:
+    """Canonical identity of a download URL, used to de-duplicate batches"""
+    if is_instagram_url(url):
+        return media_cache_key(url) or url
+    if is_facebook_url(url):
+        video_id = extract_facebook_video_id(url)
+        return f"fb:{video_id}" if video_id else url
+    return url
+
 def get_cached_media(url: str) -> Optional[List[Dict]]:
     """Get cached media data if available"""
-    cache_key = f"instagram_media_{hash(url)}"
-    return cache.get(cache_key)
+    cache_key = media_cache_key(url)
+    return media_cache.get(cache_key) if cache_key else None
 
 def cache_media(url: str, media_data: List[Dict]) -> None:
-    """Cache media data"""
-    cache_key = f"instagram_media_{hash(url)}"
-    cache.set(cache_key, media_data, CACHE_TIMEOUT)
+    """Cache media data until shortly before its CDN links expire"""
+    cache_key = media_cache_key(url)
+    if cache_key:
+        cache_media_by_key(cache_key, media_data)
+
+def cache_media_by_key(cache_key: str, media_data: List[Dict]) -> None:
+    """Cache media data under a canonical key (ig:<shortcode> / fb:<video id>)"""
+    timeout = media_cache_timeout(media_data)
+    if timeout > 0:
+        media_cache.set(cache_key, media_data, timeout)
+
+async def load_stored_media(cache_key: str, refresh) -> Optional[List[Dict]]:
+    """
+    Serve media from the persistent store and warm the cache with it.
+    Stale entries are returned at once while refresh() runs in the background.
+    """
+    stored = await load_media(cache_key)
+    if not stored:
+        return None
+    
+    media, is_stale = stored
+    cache_media_by_key(cache_key, media)
+    if is_stale:
+        schedule_refresh(cache_key, refresh)
+    logger.info(f"Returning stored data for {cache_key} (stale={is_stale})")
+    return media
+
+def get_cached_failure(url: str) -> Optional[MediaUnavailableError]:
+    """Get a cached permanent failure (missing/private/unsupported) if available"""
+    cache_key = media_cache_key(url)
+    failure = negative_cache.get(cache_key) if cache_key else None
+    return MediaUnavailableError.from_dict(failure) if failure else None
+
+def cache_failure(url: str, error: MediaUnavailableError) -> None:
+    """Negative-cache a permanent failure so retries don't spend account requests"""
+    cache_key = media_cache_key(url)
+    if cache_key:
+        negative_cache.set(cache_key, error.to_dict(), NEGATIVE_TIMEOUT)
 
 # --- Enhanced Instagram Media Fetcher ---
-def fetch_instagram_media(url: str) -> List[Dict]:
+def _fetch_post_media(context: instaloader.InstaloaderContext, shortcode: str) -> Tuple[str, List[Dict]]:
+    """
+    Fetch a post and collect its (typename, media) (blocking - run it through run_blocking)
+    """
+    try:
+        post = instaloader.Post.from_shortcode(context, shortcode)
+    except instaloader.exceptions.BadResponseException as e:
+        if not is_missing_post(e):
+            raise
+        # Deleted, private or never existed - not a hiccup worth a retry
+        raise MediaUnavailableError(MediaUnavailableError.NOT_FOUND, "Post not found or is private") from e
+    
+    results = []
+    
+    if post.typename == 'GraphSidecar':  # Carousel (multiple media)
+        logger.info(f"Processing carousel post with {post.mediacount} items")
+        
+        for i, node in enumerate(post.get_sidecar_nodes()):
+            try:
+                if node.is_video:
+                    results.append({
+                        "type": "video",
+                        "url": node.video_url,
+                        "thumbnail": node.display_url,
+                        "index": i
+                    })
+                    logger.debug(f"Added video {i+1}")
+                else:
+                    results.append({
+                        "type": "image",
+                        "url": node.display_url,
+                        "index": i
+                    })
+                    logger.debug(f"Added image {i+1}")
+            except Exception as e:
+                logger.warning(f"Failed to process carousel item {i}: {e}")
+                continue
+                
+    else:  # Single image or video
+        try:
+            if post.is_video:
+                results.append({
+                    "type": "video",
+                    "url": post.video_url,
+                    "thumbnail": post.url
+                })
+                logger.info("Added single video")
+            else:
+                results.append({
+                    "type": "image",
+                    "url": post.url
+                })
+                logger.info("Added single image")
+        except Exception as e:
+            logger.error(f"Failed to process single media: {e}")
+            raise
+    
+    return post.typename, results
+
+async def fetch_instagram_media_async(url: str, deadline: Optional[Deadline] = None) -> List[Dict]:
     """
-    Fetch Instagram media with enhanced error handling and caching
+    Fetch Instagram media with enhanced error handling and caching.
+    Blocking instaloader calls run in a bounded executor and every delay
+    is a non-blocking await, so one process can hold many fetches in flight.
+    Raises DeadlineExceeded when the request's deadline can't be met.
     """
+    deadline = deadline or Deadline()
     # Check cache first
     cached_data = get_cached_media(url)
     if cached_data:
@@ -91,163 +263,249 @@ def fetch_instagram_media(url: str) -> List[Dict]:
     if not shortcode:
         raise ValueError("Invalid Instagram post URL - could not extract shortcode")
     
-    session_manager = get_session_manager()
+    cached_failure = get_cached_failure(url)
+    if cached_failure:
+        logger.info(f"Returning cached failure ({cached_failure.reason}) for {shortcode}")
+        raise cached_failure
+    
+    async def fetch(deadline: Deadline):
+        # Concurrent requests for the same post share one upstream fetch (run under the first caller's deadline)
+        while True:
+            try:
+                return await deadline.wait_for(
+                    instagram_flight.do(shortcode, lambda: _fetch_instagram_uncached(url, shortcode, deadline)),
+                    "Instagram fetch"
+                )
+            except DeadlineExceeded as e:
+                # The shared fetch ran out of another caller's time; ours may not have
+                if e.deadline is deadline or deadline.expired:
+                    raise
+    
+    async def refresh():
+        return await fetch(Deadline())
+    
+    # The persistent store survives restarts; stale entries are served while a refresh runs
+    stored = await load_stored_media(media_cache_key(url), refresh)
+    if stored:
+        return stored
+    
+    return await fetch(deadline)
+
+async def _record_failure(url: str, error: MediaUnavailableError) -> None:
+    """Negative-cache a permanent failure and drop any stored copy"""
+    cache_failure(url, error)
+    await delete_media(media_cache_key(url))
+
+async def _instagram_attempt(shortcode: str, deadline: Deadline) -> Tuple[str, List[Dict]]:
+    """One fetch on one leased account; the lease is released with the outcome"""
+    started = time.monotonic()
+    lease = await acquire_instagram_session(deadline.cap(CHECKOUT_TIMEOUT, "account checkout"))
+    username, L = lease.username, lease.session
+    fetch = None
+    release_on_done = False
+    try:
+        assert L.context.username is not None, "Instaloader not logged in!"
+        logger.info(f"Using account {username} to fetch {shortcode}")
+        
+        # Add small random delay to avoid seeming too automated
+        await deadline.sleep(random.uniform(1, 3), "Instagram fetch")
+        
+        # Fetch the post in the executor. The lease follows the executor's own
+        # future, not an asyncio task that dies with this call's event loop.
+        fetch = _instaloader_executor.submit(_fetch_post_media, L.context, shortcode)
+        typename, results = await deadline.wait_for(asyncio.shield(asyncio.wrap_future(fetch)), "Instagram fetch")
+        
+        if not results:
+            raise MediaUnavailableError(MediaUnavailableError.UNSUPPORTED, "No media found in the post")
+    
+    except (instaloader.exceptions.ProfileNotExistsException,
+            instaloader.exceptions.QueryReturnedNotFoundException,
+            instaloader.exceptions.PrivateProfileNotFollowedException,
+            MediaUnavailableError):
+        # Missing/private posts say nothing about the account's health
+        lease.release(success=True)
+        raise
+    except DeadlineExceeded:
+        # Says nothing about the account; released below
+        raise
+    except instaloader.exceptions.LoginRequiredException:
+        logger.error(f"Login required for account {username}")
+        lease.release(success=False, failure=CircuitBreaker.LOGIN_REQUIRED)
+        raise
+    except instaloader.exceptions.TooManyRequestsException:
+        logger.warning(f"Rate limit hit for account {username}")
+        lease.release(success=False, failure=CircuitBreaker.RATE_LIMITED)
+        raise
+    except Exception as e:
+        if is_missing_post(e):
+            # Content error that slipped past _fetch_post_media; bad links must not open circuits
+            lease.release(success=True)
+            raise MediaUnavailableError(MediaUnavailableError.NOT_FOUND, "Post not found or is private") from e
+        lease.release(success=False, failure=classify_failure(e))
+        raise
+    finally:
+        if fetch is not None and not fetch.done():
+            # Out of time or cancelled mid-fetch: the executor thread can't be
+            # stopped, so the account stays leased until it's done
+            release_on_done = True
+            fetch.add_done_callback(lambda f: lease.release(success=True))
+        if not release_on_done:
+            # Succeeded, or gave up before the fetch started (no-op if already released)
+            lease.release(success=True)
     
-    username, L = get_instagram_session_with_tracking()
-    assert L.context.username is not None, "Instaloader not logged in!"
+    instagram_hedge.record_latency(time.monotonic() - started)
+    return typename, results
+
+async def _fetch_instagram_uncached(url: str, shortcode: str, deadline: Deadline) -> List[Dict]:
+    """Retry loop behind fetch_instagram_media_async; runs once per in-flight shortcode"""
     for attempt in range(MAX_RETRIES):
+        # Lease an account per attempt so retries move to another account
         try:
-            logger.info(f"Attempt {attempt + 1}: Using account {username} to fetch {shortcode}")
-            
-            # Add small random delay to avoid seeming too automated
-            time.sleep(random.uniform(1, 3))
-            
-            # Fetch the post
-            post = instaloader.Post.from_shortcode(L.context, shortcode)
-            
-            results = []
-            
-            if post.typename == 'GraphSidecar':  # Carousel (multiple media)
-                logger.info(f"Processing carousel post with {post.mediacount} items")
-                
-                for i, node in enumerate(post.get_sidecar_nodes()):
-                    try:
-                        if node.is_video:
-                            results.append({
-                                "type": "video",
-                                "url": node.video_url,
-                                "thumbnail": node.display_url,
-                                "index": i
-                            })
-                            logger.debug(f"Added video {i+1}")
-                        else:
-                            results.append({
-                                "type": "image",
-                                "url": node.display_url,
-                                "index": i
-                            })
-                            logger.debug(f"Added image {i+1}")
-                    except Exception as e:
-                        logger.warning(f"Failed to process carousel item {i}: {e}")
-                        continue
-                        
-            else:  # Single image or video
-                try:
-                    if post.is_video:
-                        results.append({
-                            "type": "video",
-                            "url": post.video_url,
-                            "thumbnail": post.url
-                        })
-                        logger.info("Added single video")
-                    else:
-                        results.append({
-                            "type": "image",
-                            "url": post.url
-                        })
-                        logger.info("Added single image")
-                except Exception as e:
-                    logger.error(f"Failed to process single media: {e}")
-                    raise
-            
-            if not results:
-                raise ValueError("No media found in the post")
-            
-            # Record successful usage
-            session_manager.record_usage(username, success=True)
+            logger.info(f"Attempt {attempt + 1} to fetch {shortcode}")
+            if HEDGE_ENABLED:
+                # A hedge can't reuse the first attempt's account - it's still leased
+                typename, results = await instagram_hedge.run(lambda: _instagram_attempt(shortcode, deadline))
+            else:
+                typename, results = await _instagram_attempt(shortcode, deadline)
             
-            # Cache the results
+            # Cache and persist the results
             cache_media(url, results)
+            await save_media(media_cache_key(url), "instagram", results, typename)
             
             logger.info(f"Successfully fetched {len(results)} media items from {shortcode}")
             return results
             
         except instaloader.exceptions.LoginRequiredException:
-            logger.error(f"Login required for account {username}")
-            if username:
-                session_manager.record_usage(username, success=False)
-            
             if attempt < MAX_RETRIES - 1:
                 logger.info(f"Retrying with different account...")
-                time.sleep(RETRY_DELAY)
+                await deadline.sleep(RETRY_DELAY)
                 continue
             else:
                 raise RuntimeError("All Instagram accounts require re-authentication")
                 
-        except instaloader.exceptions.ProfileNotExistsException:
+        except (instaloader.exceptions.ProfileNotExistsException,
+                instaloader.exceptions.QueryReturnedNotFoundException):
             logger.error(f"Post {shortcode} not found or is private")
-            raise ValueError("Post not found or is private")
+            error = MediaUnavailableError(MediaUnavailableError.NOT_FOUND, "Post not found or is private")
+            await _record_failure(url, error)
+            raise error
             
         except instaloader.exceptions.PrivateProfileNotFollowedException:
             logger.error(f"Post {shortcode} is from a private account")
-            raise ValueError("Cannot access private account content")
+            error = MediaUnavailableError(MediaUnavailableError.PRIVATE, "Cannot access private account content")
+            await _record_failure(url, error)
+            raise error
+        
+        except MediaUnavailableError as error:
+            logger.error(f"Post {shortcode} is unavailable ({error.reason}): {error}")
+            await _record_failure(url, error)
+            raise
             
         except instaloader.exceptions.TooManyRequestsException:
-            logger.warning(f"Rate limit hit for account {username}")
-            if username:
-                session_manager.record_usage(username, success=False)
-            
             if attempt < MAX_RETRIES - 1:
                 wait_time = RETRY_DELAY * (2 ** attempt)  # Exponential backoff
                 logger.info(f"Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+                await deadline.sleep(wait_time)
                 continue
             else:
                 raise RuntimeError("Instagram rate limit exceeded for all accounts")
+        
+        except (SessionBusyError, DeadlineExceeded):
+            raise
                 
         except Exception as e:
             logger.error(f"Unexpected error fetching Instagram media: {e}")
-            if username:
-                session_manager.record_usage(username, success=False)
             
             if attempt < MAX_RETRIES - 1:
                 logger.info(f"Retrying after error... ({attempt + 1}/{MAX_RETRIES})")
-                time.sleep(RETRY_DELAY)
+                await deadline.sleep(RETRY_DELAY)
                 continue
             else:
                 raise RuntimeError(f"Failed to fetch Instagram media after {MAX_RETRIES} attempts: {e}")
     
     raise RuntimeError("Failed to fetch Instagram media - all attempts exhausted")
 
+def fetch_instagram_media(url: str, deadline: Optional[Deadline] = None) -> List[Dict]:
+    """Synchronous wrapper around fetch_instagram_media_async"""
+    return async_to_sync(fetch_instagram_media_async)(url, deadline)
+
 # --- Enhanced Facebook Downloader ---
-def fetch_facebook_video(url: str) -> List[Dict]:
+def _resolve_facebook_link(url: str, timeout: float = FACEBOOK_LINK_TIMEOUT) -> str:
+    """Follow a short/share link's redirects (blocking - run it through run_blocking)"""
+    # Facebook links don't get the Instagram Referer the shared client sends by default
+    with media_http.get(url, headers={'Referer': None}, allow_redirects=True, stream=True, timeout=timeout) as response:
+        return response.url
+
+async def facebook_cache_key(url: str, deadline: Optional[Deadline] = None) -> str:
+    """
+    Canonical cache key for a Facebook video (fb:<video id>). fb.watch and
+    share links are resolved once and the mapping is remembered.
+    """
+    url = url.strip()
+    video_id = extract_facebook_video_id(url)
+    if video_id:
+        return f"fb:{video_id}"
+    
+    video_id = facebook_link_cache.get(url)
+    if video_id:
+        return f"fb:{video_id}"
+    
+    try:
+        timeout = (deadline or Deadline()).cap(FACEBOOK_LINK_TIMEOUT, "Facebook link resolution")
+        resolved_url = await run_blocking(_resolve_facebook_link, url, timeout)
+        # Login walls keep the target in ?next=, so search the unquoted URL
+        video_id = extract_facebook_video_id(unquote(resolved_url))
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Could not resolve Facebook link {url}: {e}")
+    
+    if not video_id:
+        return f"fb:{url}"
+    
+    facebook_link_cache.set(url, video_id, FACEBOOK_LINK_MAPPING_TTL)
+    logger.info(f"Resolved Facebook link {url} to video {video_id}")
+    return f"fb:{video_id}"
+
+async def fetch_facebook_video_async(url: str, deadline: Optional[Deadline] = None) -> List[Dict]:
     """
     Fetch Facebook video with enhanced error handling and timeout management
     """
+    deadline = deadline or Deadline()
+    cache_key = await facebook_cache_key(url, deadline)
+    
+    cached_data = media_cache.get(cache_key)
+    if cached_data:
+        logger.info(f"Returning cached data for {cache_key}")
+        return cached_data
+    
+    async def fetch(deadline: Deadline):
+        # Concurrent requests for the same video share one extraction (run under the first caller's deadline)
+        while True:
+            try:
+                return await deadline.wait_for(
+                    facebook_flight.do(cache_key, lambda: _fetch_facebook_uncached(url, cache_key, deadline)),
+                    "Facebook extraction"
+                )
+            except DeadlineExceeded as e:
+                if e.deadline is deadline or deadline.expired:
+                    raise
+    
+    async def refresh():
+        return await fetch(Deadline())
+    
+    stored = await load_stored_media(cache_key, refresh)
+    if stored:
+        return stored
+    
+    return await fetch(deadline)
+
+async def _fetch_facebook_uncached(url: str, cache_key: str, deadline: Deadline) -> List[Dict]:
+    """Run yt-dlp for a Facebook URL; runs once per in-flight video"""
     try:
         logger.info(f"Downloading Facebook video: {url}")
         
-        # Use yt-dlp with specific options for Facebook
-        cmd = [
-            "yt-dlp",
-            "--no-playlist",
-            "--quiet",
-            "--dump-json",
-            "--socket-timeout", "30",
-            "--retries", "3",
-            url
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60  # Increased timeout
-        )
-        
-        if result.returncode != 0:
-            error_msg = result.stderr.strip() if result.stderr else "Unknown error"
-            logger.error(f"yt-dlp failed: {error_msg}")
-            raise Exception(f"Failed to fetch Facebook video: {error_msg}")
-        
-        if not result.stdout.strip():
-            raise Exception("No metadata returned from yt-dlp")
-        
-        try:
-            metadata = json.loads(result.stdout)
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse yt-dlp output: {e}")
-            raise Exception("Invalid response from video service")
+        # Extract in a warm yt-dlp worker instead of a fresh process per request
+        timeout = deadline.cap(FACEBOOK_TIMEOUT, "Facebook extraction")
+        metadata = await run_blocking(ytdlp_pool.extract, url, timeout)
         
         video_url = metadata.get("url")
         if not video_url:
@@ -261,17 +519,22 @@ def fetch_facebook_video(url: str) -> List[Dict]:
             "thumbnail": metadata.get("thumbnail")
         }]
         
+        # Cache and persist the results
+        cache_media_by_key(cache_key, result_data)
+        await save_media(cache_key, "facebook", result_data)
+        
         logger.info(f"Successfully fetched Facebook video metadata")
         return result_data
         
-    except subprocess.TimeoutExpired:
+    except DeadlineExceeded:
+        raise
+        
+    except TimeoutError:
         logger.error("Timeout while fetching Facebook video")
+        if deadline.expired:
+            raise DeadlineExceeded("Facebook extraction", deadline)
         raise Exception("Request timeout - the video may be too large or unavailable")
         
-    except FileNotFoundError:
-        logger.error("yt-dlp not found - please install it")
-        raise Exception("Video downloader not available - please contact support")
-        
     except Exception as e:
         logger.error(f"Facebook download error: {e}")
         if "private" in str(e).lower():
@@ -281,6 +544,10 @@ def fetch_facebook_video(url: str) -> List[Dict]:
         else:
             raise Exception(f"Failed to download Facebook video: {str(e)}")
 
+def fetch_facebook_video(url: str, deadline: Optional[Deadline] = None) -> List[Dict]:
+    """Synchronous wrapper around fetch_facebook_video_async"""
+    return async_to_sync(fetch_facebook_video_async)(url, deadline)
+
 # --- Health Check Functions ---
 def check_instagram_health() -> Dict[str, any]:
     """Check the health of Instagram session manager"""
@@ -288,12 +555,35 @@ def check_instagram_health() -> Dict[str, any]:
         session_manager = get_session_manager()
         active_sessions = sum(1 for status in session_manager.account_status.values() if status.get('active', False))
         total_sessions = len(session_manager.account_status)
+        warm_up = session_manager.readiness()
+        
+        if active_sessions > 0:
+            status = 'healthy'
+        elif warm_up['warming']:
+            status = 'warming'
+        else:
+            status = 'unhealthy'
         
         return {
-            'status': 'healthy' if active_sessions > 0 else 'unhealthy',
+            'status': status,
             'active_sessions': active_sessions,
             'total_sessions': total_sessions,
-            'initialized': session_manager.initialized
+            'initialized': session_manager.initialized,
+            'warm_up': warm_up,
+            'session_age': session_manager.health.stats(session_manager.account_status),
+            'login_queue': session_manager.login_queue.stats(),
+            'circuits': session_manager.circuit_stats(),
+            'hedging': {'enabled': HEDGE_ENABLED, **instagram_hedge.stats()},
+            'disk_cache': disk_cache.usage(),
+            'media_http': media_http.stats(),
+            'async_media_http': async_media_http.stats(),
+            'media_cache': media_cache.stats(),
+            'negative_cache': negative_cache.stats(),
+            'ytdlp_pool': dict(ytdlp_pool.stats),
+            'coalescing': {
+                'instagram': instagram_flight.stats(),
+                'facebook': facebook_flight.stats()
+            }
         }
     except Exception as e:
         return {
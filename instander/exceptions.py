@@ -0,0 +1,39 @@
+class MediaUnavailableError(ValueError):
+    """
+    A post or video that can't be fetched no matter how often we retry
+    (missing, private or unsupported). Safe to negative-cache.
+    """
+
+    NOT_FOUND = "not_found"
+    PRIVATE = "private"
+    UNSUPPORTED = "unsupported"
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+        self.message = message
+
+    def to_dict(self) -> dict:
+        return {'reason': self.reason, 'message': self.message}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MediaUnavailableError":
+        return cls(data['reason'], data['message'])
+
+
+class SessionBusyError(RuntimeError):
+    """Every Instagram account is leased or rate limited; retry after retry_after seconds"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"All Instagram accounts are busy, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(TimeoutError):
+    """A request's time budget ran out (or can't cover the next step)"""
+
+    def __init__(self, what: str = "request", deadline=None):
+        super().__init__(f"Deadline exceeded before {what} could finish")
+        self.what = what
+        # The Deadline that ran out, so callers can tell theirs from someone else's
+        self.deadline = deadline
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class HedgePolicy:
+    """
+    Decides when a slow call gets a second, parallel attempt. The hedge
+    delay is a percentile of recent successful latencies; a token budget
+    earns `budget_percent` of a token per call and spends a whole one per
+    hedge, so extra requests never exceed that share of traffic.
+    """
+
+    def __init__(self, name: str, percentile: float, budget_percent: float,
+                 min_samples: int = 20, window: int = 200, max_tokens: float = 10):
+        self.name = name
+        self.percentile = percentile
+        self.budget_ratio = budget_percent / 100
+        self.min_samples = min_samples
+        self.max_tokens = max_tokens
+        self.latencies = deque(maxlen=window)
+        self.tokens = 0.0
+        self.lock = threading.Lock()
+        self.counts = {'calls': 0, 'hedged': 0, 'hedge_wins': 0, 'over_budget': 0}
+
+    def record_latency(self, seconds: float):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging; None until there are enough samples"""
+        with self.lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+
+    def _earn(self):
+        with self.lock:
+            self.counts['calls'] += 1
+            self.tokens = min(self.max_tokens, self.tokens + self.budget_ratio)
+
+    def _spend(self) -> bool:
+        with self.lock:
+            if self.tokens < 1:
+                self.counts['over_budget'] += 1
+                return False
+            self.tokens -= 1
+            self.counts['hedged'] += 1
+            return True
+
+    async def run(self, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await attempt(); if it outlives the hedge delay, start a second one
+        and return whichever succeeds first. The slower attempt is cancelled;
+        only a fetch already running in its executor thread (which can't be
+        interrupted) completes in the background.
+        """
+        self._earn()
+        first = asyncio.ensure_future(attempt())
+        delay = self.delay()
+        if delay is None:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not self._spend():
+            return await first
+
+        logger.info(f"Hedging slow {self.name} call after {delay:.2f}s")
+        second = asyncio.ensure_future(attempt())
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        with self.lock:
+                            self.counts['hedge_wins'] += 1
+                    for loser in pending:
+                        # Don't let it check out an account or start a request it no longer needs
+                        loser.cancel()
+                        # Retrieve the loser's outcome so it isn't logged as never retrieved
+                        loser.add_done_callback(lambda t: t.cancelled() or t.exception())
+                    return task.result()
+                if error is None or task is first:
+                    error = task.exception()
+        raise error
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                **self.counts,
+                'samples': len(self.latencies),
+                'tokens': round(self.tokens, 2),
+            }
@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import weakref
+import logging
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Dict, Optional, Tuple
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+from .deadline import Deadline
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = getattr(settings, "MEDIA_HTTP_CONNECT_TIMEOUT", 3.05)
+READ_TIMEOUT = getattr(settings, "MEDIA_HTTP_READ_TIMEOUT", 20)
+# Keep-alive connections kept per host, and how many hosts keep a pool
+POOL_MAXSIZE = getattr(settings, "MEDIA_HTTP_POOL_MAXSIZE", 16)
+POOL_HOSTS = getattr(settings, "MEDIA_HTTP_POOL_HOSTS", 32)
+# Larger pools for hosts we hit hardest, matched on the host name's suffix
+HOST_POOL_SIZES = getattr(settings, "MEDIA_HTTP_HOST_POOL_SIZES", {
+    "cdninstagram.com": 32,
+    "fbcdn.net": 32,
+})
+
+# The async client has no per-host pools: one limit on open sockets per
+# process (it's meant to hold thousands of slow downloads) and on idle ones
+ASYNC_MAX_CONNECTIONS = getattr(settings, "MEDIA_HTTP_ASYNC_MAX_CONNECTIONS", 2000)
+ASYNC_MAX_KEEPALIVE = getattr(settings, "MEDIA_HTTP_ASYNC_MAX_KEEPALIVE", 128)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Referer': 'https://www.instagram.com/',
+}
+
+class PerHostPoolAdapter(HTTPAdapter):
+    """HTTPAdapter whose per-host connection pool size can be raised for chosen hosts"""
+
+    def __init__(self, host_pool_sizes: Dict[str, int], **kwargs):
+        self.host_pool_sizes = host_pool_sizes
+        super().__init__(**kwargs)
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        host = host_params.get("host") or ""
+        for suffix, size in self.host_pool_sizes.items():
+            if host == suffix or host.endswith("." + suffix):
+                pool_kwargs["maxsize"] = size
+                break
+        return host_params, pool_kwargs
+
+def _counting_pool(pool_cls, on_connect):
+    """Pool class whose connections report every socket they open (new or re-opened)"""
+    class CountingConnection(pool_cls.ConnectionCls):
+        def connect(self):
+            on_connect()
+            super().connect()
+
+    return type(pool_cls.__name__, (pool_cls,), {'ConnectionCls': CountingConnection})
+
+class MediaHTTPClient:
+    """
+    One keep-alive requests.Session shared by every thread that fetches
+    media. urllib3's pools are thread-safe, and cookies are refused so no
+    state leaks between requests. Sockets opened vs responses received are
+    counted to show how often a connection is reused.
+    """
+
+    def __init__(self, pool_hosts: int, pool_maxsize: int, host_pool_sizes: Dict[str, int],
+                 connect_timeout: float, read_timeout: float):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.lock = threading.Lock()
+        self.counts = {'requests': 0, 'connections': 0}
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self.session.hooks['response'].append(self._count_request)
+
+        # Only failed connects are retried; a read may already have had side effects upstream
+        retries = Retry(total=2, connect=1, read=0, status=0, redirect=5, backoff_factor=0.1)
+        self.adapter = PerHostPoolAdapter(
+            host_pool_sizes,
+            pool_connections=pool_hosts,
+            pool_maxsize=pool_maxsize,
+            max_retries=retries,
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        poolmanager = self.adapter.poolmanager
+        poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool(pool_cls, self._count_connection)
+            for scheme, pool_cls in poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def _count_request(self, response, *args, **kwargs):
+        with self.lock:
+            self.counts['requests'] += 1
+
+    def _count_connection(self):
+        with self.lock:
+            self.counts['connections'] += 1
+
+    def timeout(self, deadline: Optional[Deadline] = None, read: Optional[float] = None) -> Tuple[float, float]:
+        """(connect, read) timeouts, each shortened to what's left of the deadline"""
+        read = read or self.read_timeout
+        if deadline is None:
+            return self.connect_timeout, read
+        return deadline.cap(self.connect_timeout), deadline.cap(read)
+
+    def get(self, url: str, deadline: Optional[Deadline] = None, read_timeout: Optional[float] = None,
+            **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout(deadline, read_timeout))
+        return self.session.get(url, **kwargs)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            sent, opened = self.counts['requests'], self.counts['connections']
+        return {
+            'requests': sent,
+            'connections_opened': opened,
+            'reuse_ratio': round(max(0.0, 1 - opened / sent), 3) if sent else None,
+            'pools': len(self.adapter.poolmanager.pools),
+        }
+
+class AsyncMediaHTTPClient:
+    """
+    httpx counterpart of MediaHTTPClient for the async proxy views. An
+    httpx.AsyncClient belongs to the event loop that created it, so one is
+    kept per loop - a single one under an ASGI server.
+    """
+
+    def __init__(self, max_connections: int, max_keepalive: int, connect_timeout: float, read_timeout: float):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.clients = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+        self.counts = {'requests': 0, 'connections': 0}
+
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self.clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                cookies=httpx.Cookies(CookieJar(DefaultCookiePolicy(allowed_domains=[]))),
+                follow_redirects=True,
+                # Retries failed connects only, like the sync client
+                transport=httpx.AsyncHTTPTransport(limits=self.limits, retries=1),
+            )
+            self.clients[loop] = client
+        return client
+
+    def timeout(self, deadline: Optional[Deadline] = None) -> httpx.Timeout:
+        """Connect/pool and per-read timeouts, each shortened to what's left of the deadline"""
+        connect, read = self.connect_timeout, self.read_timeout
+        if deadline is not None:
+            connect, read = deadline.cap(connect), deadline.cap(read)
+        return httpx.Timeout(read, connect=connect, pool=connect)
+
+    async def _trace(self, event: str, info: Dict):
+        if event == "connection.connect_tcp.complete":
+            with self.lock:
+                self.counts['connections'] += 1
+
+    async def stream(self, url: str, deadline: Optional[Deadline] = None,
+                     headers: Optional[Dict] = None) -> httpx.Response:
+        """GET that returns once the headers are in; the caller reads the body and must aclose() it"""
+        client = self.client()
+        request = client.build_request(
+            "GET", url, headers=headers, timeout=self.timeout(deadline), extensions={'trace': self._trace}
+        )
+        response = await client.send(request, stream=True)
+        with self.lock:
+            self.counts['requests'] += 1
+        return response
+
+    def stats(self) -> Dict:
+        with self.lock:
+            sent, opened = self.counts['requests'], self.counts['connections']
+        return {
+            'requests': sent,
+            'connections_opened': opened,
+            'reuse_ratio': round(max(0.0, 1 - opened / sent), 3) if sent else None,
+        }
+
+# Global instances
+media_http = MediaHTTPClient(
+    pool_hosts=POOL_HOSTS,
+    pool_maxsize=POOL_MAXSIZE,
+    host_pool_sizes=HOST_POOL_SIZES,
+    connect_timeout=CONNECT_TIMEOUT,
+    read_timeout=READ_TIMEOUT,
+)
+async_media_http = AsyncMediaHTTPClient(
+    max_connections=ASYNC_MAX_CONNECTIONS,
+    max_keepalive=ASYNC_MAX_KEEPALIVE,
+    connect_timeout=CONNECT_TIMEOUT,
+    read_timeout=READ_TIMEOUT,
+)
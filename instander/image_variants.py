@@ -0,0 +1,53 @@
+import io
+import logging
+from typing import Optional, Tuple
+from django.conf import settings
+from PIL import Image, ImageOps
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Requested widths are rounded up to one of these so the cache holds a few
+# variants per image instead of one per pixel width
+VARIANT_WIDTHS = tuple(sorted(getattr(settings, "PROXY_IMAGE_WIDTHS", (320, 640, 1080))))
+VARIANT_QUALITY = getattr(settings, "PROXY_IMAGE_QUALITY", 75)
+
+Image.init()
+# AVIF needs Pillow built with libavif; fall back to WebP without it
+SUPPORTED_FORMATS = tuple(fmt for fmt in ("avif", "webp") if fmt.upper() in Image.SAVE) + ("jpeg",)
+
+def snap_width(width: int) -> int:
+    """Smallest configured width that is at least `width`"""
+    for candidate in VARIANT_WIDTHS:
+        if candidate >= width:
+            return candidate
+    return VARIANT_WIDTHS[-1]
+
+def negotiate_format(accept: str, requested: Optional[str] = None) -> str:
+    """Explicitly requested format if we can encode it, else the best one the Accept header allows"""
+    if requested in SUPPORTED_FORMATS:
+        return requested
+    accept = accept or ""
+    for fmt in SUPPORTED_FORMATS[:-1]:
+        if f"image/{fmt}" in accept:
+            return fmt
+    return "jpeg"
+
+def render_variant(body: bytes, width: Optional[int], fmt: str) -> Tuple[bytes, str]:
+    """Downscale an image to `width` (never up; None keeps its size) and re-encode it; returns (bytes, content type)"""
+    with Image.open(io.BytesIO(body)) as image:
+        image = ImageOps.exif_transpose(image)
+        if width and image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+
+        if fmt == "jpeg" or image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB" if fmt == "jpeg" or "A" not in image.mode else "RGBA")
+
+        output = io.BytesIO()
+        options = {'quality': VARIANT_QUALITY}
+        if fmt == "webp":
+            options['method'] = 4
+        elif fmt == "jpeg":
+            options.update(optimize=True, progressive=True)
+        image.save(output, format=fmt.upper(), **options)
+    return output.getvalue(), f"image/{fmt}"
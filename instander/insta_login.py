@@ -1,19 +1,25 @@
 import os
 import json
 import time
+import asyncio
 import threading
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
 import logging
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import instaloader
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from django.conf import settings
 from django.core.cache import cache
-import random
+from asgiref.sync import sync_to_async
+from .exceptions import SessionBusyError
+from .rate_limit import SharedRateLimiter
+from .session_broker import SessionBroker
+from .session_health import SessionHealth
+from .login_queue import LoginQueue
+from .circuit_breaker import CircuitBreaker
+from .scheduler import AccountScheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,61 +28,100 @@ logger = logging.getLogger(__name__)
 # Configuration
 SESSION_DIR = os.path.join(settings.BASE_DIR, "sessions")
 LOGIN_FILE = os.path.join(settings.BASE_DIR, "login_accounts.json")
+LOGIN_QUEUE_DIR = os.path.join(SESSION_DIR, "login-queue")
 RATE_LIMIT_CACHE_KEY = "instagram_rate_limit"
 ACCOUNT_STATUS_CACHE_KEY = "instagram_account_status"
-SESSION_VALIDITY_HOURS = 24
+SESSION_FRESH_SECONDS = getattr(settings, "INSTAGRAM_SESSION_FRESH_SECONDS", 6 * 3600)
+KEEPALIVE_INTERVAL = getattr(settings, "INSTAGRAM_SESSION_KEEPALIVE_INTERVAL", 600)
+CHECKOUT_TIMEOUT = getattr(settings, "INSTAGRAM_SESSION_CHECKOUT_TIMEOUT", 15)
+LEASE_MIN_WAIT = 0.5
+MANIFEST_CHECK_INTERVAL = 1
+BROKER_WAIT_TIMEOUT = getattr(settings, "INSTAGRAM_BROKER_WAIT_TIMEOUT", 60)
+WARM_UP_WORKERS = getattr(settings, "INSTAGRAM_WARM_UP_WORKERS", 4)
+RATE_LIMIT_DB = getattr(settings, "INSTAGRAM_RATE_LIMIT_DB", os.path.join(SESSION_DIR, "ratelimit.sqlite3"))
+RATE_LIMIT_PER_HOUR = getattr(settings, "INSTAGRAM_RATE_LIMIT_PER_HOUR", 150)
+RATE_LIMIT_MIN_INTERVAL = getattr(settings, "INSTAGRAM_RATE_LIMIT_MIN_INTERVAL", 3)
+LEASE_BUSY_WAIT = 1
+BROWSER_LOGIN_TIMEOUT = getattr(settings, "INSTAGRAM_BROWSER_LOGIN_TIMEOUT", 180)
+REQUEST_TIMEOUT = getattr(settings, "INSTAGRAM_REQUEST_TIMEOUT", 30)
+BREAKER_FAILURE_THRESHOLD = getattr(settings, "INSTAGRAM_BREAKER_FAILURE_THRESHOLD", 3)
+BREAKER_PROBE_INTERVAL = getattr(settings, "INSTAGRAM_BREAKER_PROBE_INTERVAL", 10)
 
 # Ensure directories exist
 os.makedirs(SESSION_DIR, exist_ok=True)
 
+# Shared rate limit reservations for async checkouts; the SQLite transaction
+# may wait on another worker's, so it never runs on an event loop
+_reserve_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="instagram-reserve")
+
+# What instaloader raises when Instagram returns no metadata for a shortcode
+MISSING_POST_MESSAGE = "Fetching Post metadata failed."
+
+def is_missing_post(error: Exception) -> bool:
+    """A deleted, private or never-existing post - a content error that says nothing about the account"""
+    return isinstance(error, instaloader.exceptions.BadResponseException) and str(error) == MISSING_POST_MESSAGE
+
+def classify_failure(error: Exception) -> str:
+    """Map an instaloader error to a CircuitBreaker failure kind"""
+    if isinstance(error, instaloader.exceptions.TooManyRequestsException):
+        return CircuitBreaker.RATE_LIMITED
+    if isinstance(error, (instaloader.exceptions.LoginRequiredException,
+                          instaloader.exceptions.BadCredentialsException,
+                          instaloader.exceptions.TwoFactorAuthRequiredException)):
+        return CircuitBreaker.LOGIN_REQUIRED
+    return CircuitBreaker.TRANSIENT
+
 class RateLimitManager:
-    """Manages rate limiting for Instagram API calls"""
+    """
+    Manages rate limiting for Instagram API calls. Limits are enforced by a
+    shared sliding window, so all worker processes on the host draw from
+    the same per-account budget.
+    """
     
     def __init__(self):
-        self.last_request_time = {}
-        self.request_counts = {}
-        self.lock = threading.Lock()
+        # Instagram allows ~200 requests per hour, we'll be conservative with 150
+        self.backend = SharedRateLimiter(
+            RATE_LIMIT_DB,
+            limit=RATE_LIMIT_PER_HOUR,
+            window=3600,
+            min_interval=RATE_LIMIT_MIN_INTERVAL
+        )
     
     def can_make_request(self, account_username: str) -> bool:
         """Check if we can make a request for this account"""
-        with self.lock:
-            now = time.time()
-            
-            # Reset counters every hour
-            if account_username not in self.last_request_time:
-                self.last_request_time[account_username] = now
-                self.request_counts[account_username] = 0
-                return True
-            
-            # If more than an hour has passed, reset counter
-            if now - self.last_request_time[account_username] > 3600:  # 1 hour
-                self.request_counts[account_username] = 0
-                self.last_request_time[account_username] = now
-            
-            # Instagram allows ~200 requests per hour, we'll be conservative with 150
-            if self.request_counts[account_username] >= 150:
-                return False
-            
-            # Enforce minimum delay between requests (3-5 seconds)
-            min_delay = random.uniform(3, 5)
-            if now - self.last_request_time[account_username] < min_delay:
-                return False
-            
-            return True
+        return self.backend.time_until_available(account_username) == 0
+    
+    def time_until_available(self, account_username: str) -> float:
+        """Seconds until this account may make a request"""
+        return self.backend.time_until_available(account_username)
+    
+    def headroom(self, account_usernames) -> Dict[str, Tuple[int, float]]:
+        """(requests left this hour, seconds until the next request) per account"""
+        return self.backend.headroom(account_usernames)
+    
+    def reserve(self, account_username: str) -> Tuple[bool, float]:
+        """Atomically check the limit and count a request; also says how long to wait when over it"""
+        return self.backend.try_acquire(account_username)
     
     def record_request(self, account_username: str):
-        """Record that a request was made"""
-        with self.lock:
-            now = time.time()
-            self.last_request_time[account_username] = now
-            self.request_counts[account_username] = self.request_counts.get(account_username, 0) + 1
-    
-    def wait_if_needed(self, account_username: str):
-        """Wait if rate limit would be exceeded"""
-        while not self.can_make_request(account_username):
-            wait_time = random.uniform(5, 10)
-            logger.info(f"Rate limit reached for {account_username}, waiting {wait_time:.1f} seconds")
-            time.sleep(wait_time)
+        """Record that a request was made (for requests that bypassed reserve)"""
+        self.backend.try_acquire(account_username)
+
+class SessionLease:
+    """An account checked out for a single request"""
+    
+    def __init__(self, manager: "InstagramSessionManager", username: str, session: instaloader.Instaloader):
+        self.manager = manager
+        self.username = username
+        self.session = session
+        self.released = False
+    
+    def release(self, success: bool = True, failure: Optional[str] = None):
+        """Report the outcome (and CircuitBreaker failure kind) and return the account; later calls are no-ops"""
+        if self.released:
+            return
+        self.released = True
+        self.manager.release(self.username, success=success, failure=failure)
 
 class InstagramSessionManager:
     """Manages Instagram sessions with automatic failover and rate limiting"""
@@ -90,6 +135,29 @@ class InstagramSessionManager:
         self.accounts = []
         self.initialization_lock = threading.Lock()
         self.initialized = False
+        # Accounts checked out by a lease, and callers queued (FIFO) for one
+        self.leased = set()
+        self.waiters = deque()
+        # Login broker election and the manifest state this process attached to
+        self.session_broker = SessionBroker(SESSION_DIR)
+        self.attached_at = {}
+        self.manifest_mtime = 0.0
+        self.last_manifest_check = 0.0
+        # Background warm-up state; ready_event fires once the first account is usable
+        self.warm_up_thread = None
+        self.ready_event = threading.Event()
+        # Last confirmed-good time per account, and the thread that keeps sessions fresh
+        self.health = SessionHealth(SESSION_DIR, SESSION_FRESH_SECONDS)
+        self.keepalive_thread = None
+        # Set to run the next probe pass now instead of after BREAKER_PROBE_INTERVAL
+        self.probe_wakeup = threading.Event()
+        # Browser logins run in the separate login worker process
+        self.login_queue = LoginQueue(LOGIN_QUEUE_DIR)
+        # Per-account circuit breakers; account_status['active'] mirrors "closed"
+        self.breakers = {}
+        # Accounts with a closed circuit, and the free ones among them by next-available time
+        self.active_accounts = set()
+        self.scheduler = AccountScheduler(RATE_LIMIT_PER_HOUR, 3600, RATE_LIMIT_MIN_INTERVAL)
     
     def load_accounts(self) -> List[Dict[str, str]]:
         """Load accounts from JSON file"""
@@ -105,89 +173,41 @@ class InstagramSessionManager:
         return accounts
     
     def is_session_valid(self, username: str) -> bool:
-        """Check if a session file exists and is recent"""
+        """Check if a session file exists and was confirmed good recently enough to skip a probe"""
         session_file = os.path.join(SESSION_DIR, f"{username}.session")
-        if not os.path.exists(session_file):
-            return False
-        
-        # Check if session is less than 24 hours old
-        session_age = time.time() - os.path.getmtime(session_file)
-        return session_age < (SESSION_VALIDITY_HOURS * 3600)
+        return os.path.exists(session_file) and self.health.is_fresh(username)
     
-    def selenium_login(self, username: str, password: str) -> bool:
-        """Login using Selenium with enhanced error handling"""
-        session_file = os.path.join(SESSION_DIR, f"{username}.session")
-        
+    def _probe(self, L: instaloader.Instaloader, username: str) -> Optional[str]:
+        """Spend one (rate-limited) request on a session; returns the failure kind, or None if it works"""
         try:
-            logger.info(f"Starting Selenium login for {username}")
-            
-            options = Options()
-            options.add_argument("--headless=new")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--window-size=1920,1080")
-            options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-            
-            driver = webdriver.Chrome(options=options)
-            wait = WebDriverWait(driver, 20)
-            
-            try:
-                driver.get("https://www.instagram.com/accounts/login/")
-                
-                # Wait for login form to load
-                username_field = wait.until(EC.presence_of_element_located((By.NAME, "username")))
-                password_field = driver.find_element(By.NAME, "password")
-                
-                # Add random delays to mimic human behavior
-                time.sleep(random.uniform(2, 4))
-                
-                username_field.send_keys(username)
-                time.sleep(random.uniform(1, 2))
-                password_field.send_keys(password)
-                time.sleep(random.uniform(1, 2))
-                
-                # Click login button
-                login_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-                login_button.click()
-                
-                # Wait for navigation
-                time.sleep(random.uniform(5, 8))
-                
-                # Check for various possible outcomes
-                current_url = driver.current_url
-                
-                if "challenge" in current_url:
-                    logger.warning(f"Instagram checkpoint detected for {username}")
-                    return False
-                elif "login" in current_url:
-                    logger.error(f"Login failed for {username} - still on login page")
-                    return False
-                
-                # Extract cookies and save session
-                cookies = driver.get_cookies()
-                
-                # Create Instaloader instance and set cookies
-                L = instaloader.Instaloader()
-                for cookie in cookies:
-                    L.context._session.cookies.set(cookie['name'], cookie['value'])
-                
-                # Test the session by making a simple request
-                try:
-                    L.context.graphql_query("", {})  # Simple test query
-                except:
-                    pass  # Expected to fail, but session should be set
-                
-                L.save_session_to_file(session_file)
-                logger.info(f"Session saved successfully for {username}")
-                return True
-                
-            finally:
-                driver.quit()
-                
+            self.rate_limiter.record_request(username)
+            instaloader.Profile.from_username(L.context, username)
         except Exception as e:
-            logger.error(f"Selenium login failed for {username}: {e}")
+            logger.warning(f"Session probe failed for {username}: {e}")
+            return classify_failure(e)
+        self.health.confirm(username)
+        return None
+    
+    def _probe_session(self, L: instaloader.Instaloader, username: str) -> bool:
+        """Check that a session still works"""
+        return self._probe(L, username) is None
+    
+    def request_browser_login(self, username: str) -> bool:
+        """
+        Have the login worker process (run_login_worker) log an account in
+        through its browser and wait for the session file. Chrome is never
+        started in a web worker.
+        """
+        since = time.time()
+        self.login_queue.request(username)
+        result = self.login_queue.wait(username, since, BROWSER_LOGIN_TIMEOUT)
+        
+        if result is None:
+            logger.error(f"No browser login for {username} within {BROWSER_LOGIN_TIMEOUT}s - is run_login_worker running?")
             return False
+        if not result['ok']:
+            logger.error(f"Browser login failed for {username}: {result.get('error') or 'unknown error'}")
+        return result['ok']
     
     def try_login(self, account: Dict[str, str]) -> Optional[instaloader.Instaloader]:
         """Attempt to login with various methods"""
@@ -199,16 +219,18 @@ class InstagramSessionManager:
             return None
         
         session_file = os.path.join(SESSION_DIR, f"{username}.session")
-        L = instaloader.Instaloader()
+        L = instaloader.Instaloader(request_timeout=REQUEST_TIMEOUT)
         
-        # Try loading existing session if it's valid
-        if self.is_session_valid(username):
+        # Try loading an existing session; recently confirmed ones aren't probed
+        if os.path.exists(session_file):
             try:
                 L.load_session_from_file(username, session_file)
-                # Test the session
-                profile = instaloader.Profile.from_username(L.context, username)
-                logger.info(f"Loaded valid session for: {username} workuing")
-                return L
+                if self.is_session_valid(username):
+                    logger.info(f"Loaded recently confirmed session for: {username}")
+                    return L
+                if self._probe_session(L, username):
+                    logger.info(f"Loaded valid session for: {username}")
+                    return L
             except Exception as e:
                 logger.warning(f"Saved session invalid for {username}: {e}")
         
@@ -216,132 +238,573 @@ class InstagramSessionManager:
         try:
             L.login(username, password)
             L.save_session_to_file(session_file)
+            self.health.confirm(username)
             logger.info(f"Direct login successful for {username}")
             return L
         except Exception as e:
             logger.warning(f"Direct login failed for {username}: {e}")
         
-        # Fallback to Selenium
+        # Fallback to a browser login in the login worker
         logger.info(f"Attempting Selenium login for {username}")
-        if self.selenium_login(username, password):
+        if self.request_browser_login(username):
             try:
                 L.load_session_from_file(username, session_file)
-                # Test the session
-                profile = instaloader.Profile.from_username(L.context, username)
-                logger.info(f"Selenium login successful for {username}")
-                return L
+                if self._probe_session(L, username):
+                    logger.info(f"Selenium login successful for {username}")
+                    return L
             except Exception as e:
                 logger.error(f"Failed to load session after Selenium login: {e}")
         
         return None
     
-    def initialize_sessions(self):
-        """Initialize all available sessions at startup"""
+    def _breaker(self, username: str) -> CircuitBreaker:
+        """The account's circuit breaker; caller holds self.lock"""
+        if username not in self.breakers:
+            self.breakers[username] = CircuitBreaker(BREAKER_FAILURE_THRESHOLD)
+        return self.breakers[username]
+    
+    def _sync_status(self, username: str):
+        """Mirror the circuit state into account_status; caller holds self.lock"""
+        breaker = self._breaker(username)
+        status = self.account_status.setdefault(username, {'request_count': 0})
+        was_active = status.get('active', False)
+        status['active'] = breaker.is_closed
+        status['circuit'] = breaker.state
+        if breaker.is_closed:
+            self.active_accounts.add(username)
+        else:
+            self.active_accounts.discard(username)
+        self._reschedule(username)
+        if breaker.state == CircuitBreaker.OPEN:
+            status['retry_after'] = breaker.open_until
+            if was_active:
+                status['last_failed'] = time.time()
+                logger.warning(f"Circuit opened for {username} ({breaker.reason}), "
+                               f"retrying in {breaker.open_until - time.time():.0f}s")
+    
+    def _reschedule(self, username: str, not_before: float = 0.0):
+        """Keep the scheduler holding exactly the active, logged-in, unleased accounts; caller holds self.lock"""
+        if username in self.active_accounts and username in self.sessions and username not in self.leased:
+            if username not in self.scheduler:
+                self.scheduler.add(username, time.time(), not_before=not_before)
+        else:
+            self.scheduler.discard(username)
+    
+    def _activate(self, username: str, session: instaloader.Instaloader):
+        """Make a logged-in session available to leases"""
+        with self.lock:
+            self.sessions[username] = session
+            self._breaker(username).record_success()
+            self._sync_status(username)
+            self.account_status[username]['last_used'] = time.time()
+            self._dispatch()
+    
+    def _deactivate(self, username: str, retry_after: float):
+        """Take an account out of rotation until a login is retried at retry_after"""
+        with self.lock:
+            self._breaker(username).trip(CircuitBreaker.LOGIN_REQUIRED, until=retry_after)
+            self._sync_status(username)
+    
+    def _login_and_publish(self, account: Dict[str, str]) -> bool:
+        """Log an account in (broker only) and publish the result to the other workers"""
+        username = account.get("username")
+        logger.info(f"Attempting to initialize session for {username}")
+        session = self.try_login(account)
+        
+        if session:
+            self._activate(username, session)
+            self.session_broker.publish(username, ready=True)
+            logger.info(f"Session initialized for {username}")
+            return True
+        
+        retry_after = time.time() + 3600  # Retry after 1 hour
+        self.health.invalidate(username)
+        self._deactivate(username, retry_after)
+        self.session_broker.publish(username, ready=False, retry_after=retry_after)
+        logger.error(f"Failed to initialize session for {username}")
+        return False
+    
+    def _attach_account(self, username: str) -> Optional[instaloader.Instaloader]:
+        """Load a session file the broker published - no login and no probe request"""
+        session_file = os.path.join(SESSION_DIR, f"{username}.session")
+        try:
+            L = instaloader.Instaloader(request_timeout=REQUEST_TIMEOUT)
+            L.load_session_from_file(username, session_file)
+            return L
+        except Exception as e:
+            logger.warning(f"Could not attach to published session for {username}: {e}")
+            return None
+    
+    def _apply_manifest(self, manifest: Dict):
+        """Attach to accounts the broker (re)published since we last looked"""
+        for username, state in manifest['accounts'].items():
+            if state['updated_at'] <= self.attached_at.get(username, 0):
+                continue
+            self.attached_at[username] = state['updated_at']
+            
+            session = self._attach_account(username) if state['ready'] else None
+            if session:
+                self._activate(username, session)
+                logger.info(f"Attached to published session for {username}")
+            else:
+                self._deactivate(username, state.get('retry_after') or time.time() + 3600)
+    
+    def sync_with_broker(self, force: bool = False):
+        """Pick up session changes published by the broker; an mtime check at most once a second"""
+        if self.session_broker.is_broker:
+            return
+        
+        now = time.monotonic()
+        if not force and now - self.last_manifest_check < MANIFEST_CHECK_INTERVAL:
+            return
+        self.last_manifest_check = now
+        
+        mtime = self.session_broker.manifest_mtime()
+        if mtime and mtime != self.manifest_mtime:
+            self.manifest_mtime = mtime
+            self._apply_manifest(self.session_broker.read_manifest())
+    
+    def start_warm_up(self):
+        """
+        Start bringing sessions up in the background (idempotent). The broker
+        logs accounts in in parallel; other workers attach to what it publishes.
+        """
         with self.initialization_lock:
-            if self.initialized:
+            if self.warm_up_thread is not None:
                 return
-            
-            logger.info("Initializing Instagram sessions...")
             self.accounts = self.load_accounts()
+            self.warm_up_thread = threading.Thread(target=self._warm_up, name="instagram-warm-up", daemon=True)
+            self.warm_up_thread.start()
+    
+    def _mark_ready(self):
+        # Ready as soon as one account is usable; the rest keep joining
+        if not self.initialized:
+            self.initialized = True
+            logger.info(f"Instagram session manager ready with {len(self.sessions)} active sessions")
+        self.ready_event.set()
+    
+    def _warm_up(self):
+        started = time.monotonic()
+        try:
+            if self.session_broker.try_acquire():
+                logger.info("Initializing Instagram sessions...")
+                accounts = [account for account in self.accounts if account.get("username")]
+                with ThreadPoolExecutor(max_workers=WARM_UP_WORKERS, thread_name_prefix="instagram-login") as pool:
+                    futures = [pool.submit(self._login_and_publish, account) for account in accounts]
+                    for future in as_completed(futures):
+                        try:
+                            if future.result():
+                                self._mark_ready()
+                        except Exception as e:
+                            logger.error(f"Login crashed during warm-up: {e}")
+            else:
+                logger.info("Attaching to Instagram sessions published by the broker...")
+                self.session_broker.wait_for_manifest(BROKER_WAIT_TIMEOUT)
+                self.sync_with_broker(force=True)
+                if self.sessions:
+                    self._mark_ready()
+        except Exception as e:
+            logger.error(f"Instagram session warm-up failed: {e}")
+        finally:
+            logger.info(f"Instagram session warm-up finished in {time.monotonic() - started:.1f}s "
+                        f"with {len(self.sessions)}/{len(self.accounts)} accounts")
+            # Wake anyone waiting even if nothing could be logged in
+            self.ready_event.set()
+            self.start_keepalive()
+    
+    def start_keepalive(self):
+        """Start the background thread that keeps sessions validated and logged in"""
+        with self.lock:
+            if self.keepalive_thread is not None:
+                return
+            self.keepalive_thread = threading.Thread(target=self._keepalive_loop, name="instagram-keepalive", daemon=True)
+            self.keepalive_thread.start()
+    
+    def _keepalive_loop(self):
+        last_keepalive = time.monotonic()
+        while True:
+            self.probe_wakeup.wait(BREAKER_PROBE_INTERVAL)
+            self.probe_wakeup.clear()
+            try:
+                self.refresh_fleet_usage()
+                self.probe_open_circuits()
+                if time.monotonic() - last_keepalive >= KEEPALIVE_INTERVAL:
+                    last_keepalive = time.monotonic()
+                    self.keepalive()
+            except Exception as e:
+                logger.warning(f"Instagram session keepalive failed: {e}")
+    
+    def refresh_fleet_usage(self):
+        """Re-key the scheduler with every worker's recent requests per account, not just ours"""
+        with self.lock:
+            accounts = list(self.active_accounts)
+        headroom = self.rate_limiter.headroom(accounts)
+        with self.lock:
+            self.scheduler.update_fleet(headroom, time.time())
+            self._dispatch()
+    
+    def probe_open_circuits(self):
+        """Half-open every circuit whose cooldown has passed and probe the account"""
+        now = time.time()
+        with self.lock:
+            due = []
+            for username, breaker in self.breakers.items():
+                if username not in self.leased and breaker.probe_due(now):
+                    # Leased so no request gets the account while it's probed
+                    breaker.half_open()
+                    self.leased.add(username)
+                    due.append((username, breaker.reason))
+        
+        for username, reason in due:
+            try:
+                self._half_open_probe(username, reason)
+            except Exception as e:
+                logger.warning(f"Half-open probe crashed for {username}: {e}")
+                with self.lock:
+                    self._breaker(username).record_failure(CircuitBreaker.TRANSIENT)
+            finally:
+                with self.lock:
+                    self.leased.discard(username)
+                    self._sync_status(username)
+                    self._dispatch()
+    
+    def _half_open_probe(self, username: str, reason: str):
+        session = self.sessions.get(username)
+        
+        if reason == CircuitBreaker.LOGIN_REQUIRED or session is None:
+            if self.session_broker.is_broker:
+                # _login_and_publish closes or re-opens the circuit itself
+                account = next((acc for acc in self.accounts if acc['username'] == username), None)
+                if account:
+                    self._login_and_publish(account)
+                return
+            # Workers can't log in; pick up whatever the broker saved last
+            session = self._attach_account(username)
+            if session is None:
+                with self.lock:
+                    self._breaker(username).record_failure(CircuitBreaker.LOGIN_REQUIRED)
+                return
+        
+        wait = self.rate_limiter.time_until_available(username)
+        if wait > 0:
+            with self.lock:
+                self._breaker(username).postpone(time.time() + wait)
+            return
+        
+        failure = self._probe(session, username)
+        if failure is None:
+            logger.info(f"Circuit closed for {username} after a successful probe")
+            self._activate(username, session)
+        else:
+            with self.lock:
+                self._breaker(username).record_failure(failure)
+    
+    def keepalive(self):
+        """
+        Re-validate sessions halfway through their freshness window and log
+        dead ones in again, so requests never pay for validation or re-login.
+        Only the broker does this; other workers pick up what it publishes.
+        """
+        if not self.session_broker.try_acquire():
+            self.sync_with_broker(force=True)
+            return
+        
+        with self.lock:
+            active = [username for username in self.sessions if self.account_status[username].get('active')]
+        
+        for username in active:
+            if self.health.age(username) < SESSION_FRESH_SECONDS / 2:
+                continue
+            # Don't eat into a busy account's budget; the next pass will get to it
+            if not self.rate_limiter.can_make_request(username):
+                continue
             
-            for account in self.accounts:
-                username = account.get("username")
-                if not username:
-                    continue
-                
-                logger.info(f"Attempting to initialize session for {username}")
-                session = self.try_login(account)
-                
-                if session:
-                    self.sessions[username] = session
-                    self.account_status[username] = {
-                        'active': True,
-                        'last_used': time.time(),
-                        'request_count': 0
-                    }
-                    logger.info(f"Session initialized for {username}")
-                else:
-                    self.account_status[username] = {
-                        'active': False,
-                        'last_failed': time.time(),
-                        'retry_after': time.time() + 3600  # Retry after 1 hour
-                    }
-                    logger.error(f"Failed to initialize session for {username}")
-            
-            if not self.sessions:
-                raise RuntimeError("No Instagram accounts could be logged in")
+            L = self._attach_account(username)
+            if L and self._probe_session(L, username):
+                logger.info(f"Keepalive confirmed session for {username}")
+                continue
             
-            self.initialized = True
-            logger.info(f"Instagram session manager initialized with {len(self.sessions)} active sessions")
+            account = next((acc for acc in self.accounts if acc['username'] == username), None)
+            if account:
+                logger.info(f"Session for {username} went stale, logging in again")
+                self._login_and_publish(account)
     
-    def get_best_session(self) -> Tuple[str, instaloader.Instaloader]:
-        """Get the best available session considering rate limits"""
-        if not self.initialized:
-            self.initialize_sessions()
+    def initialize_sessions(self, timeout: float = BROKER_WAIT_TIMEOUT):
+        """
+        Initialize sessions, waiting only until the first account is usable.
+        Raises SessionBusyError if warm-up is still going when timeout passes.
+        """
+        self.start_warm_up()
+        warmed_up = self.ready_event.wait(timeout)
+        # Warm-up may have stopped waiting before the broker published anything
+        self.sync_with_broker(force=True)
         
+        if not self.sessions:
+            if not warmed_up:
+                raise SessionBusyError(LEASE_BUSY_WAIT)
+            raise RuntimeError("No Instagram accounts could be logged in")
+        self.initialized = True
+    
+    def readiness(self) -> Dict[str, object]:
+        """Warm-up progress for health checks"""
         with self.lock:
-            # Filter active sessions
-            active_sessions = {
-                username: session for username, session in self.sessions.items()
-                if self.account_status[username]['active']
-            }
+            active = len(self.active_accounts)
+        return {
+            'ready': self.initialized and active > 0,
+            'warming': self.warm_up_thread is not None and self.warm_up_thread.is_alive(),
+            'accounts_joined': active,
+            'accounts_total': len(self.accounts),
+        }
+    
+    def _next_ready_in(self) -> float:
+        """Seconds until a free account's rate limit is expected to clear; caller holds self.lock"""
+        wait = self.scheduler.next_ready_in(time.time())
+        if wait is None:
+            return LEASE_BUSY_WAIT
+        return max(LEASE_MIN_WAIT, wait)
+    
+    def _dispatch(self):
+        """
+        Hand the scheduler's best free accounts - available soonest, then
+        least used this window - to queued waiters in arrival order. Grants
+        still have to be claimed against the shared limit; caller holds self.lock
+        """
+        now = time.time()
+        while self.waiters:
+            waiter = self.waiters[0]
+            if waiter.done():
+                self.waiters.popleft()
+                continue
             
-            if not active_sessions:
-                raise RuntimeError("No active Instagram sessions available")
+            username = self.scheduler.pop_ready(now)
+            if username is None:
+                return
             
-            # Find session with lowest usage
-            best_username = min(
-                active_sessions.keys(),
-                key=lambda u: self.account_status[u]['request_count']
-            )
+            self.waiters.popleft()
+            self.leased.add(username)
+            waiter.set_result(SessionLease(self, username, self.sessions[username]))
+    
+    def _enqueue(self) -> concurrent.futures.Future:
+        waiter = concurrent.futures.Future()
+        with self.lock:
+            if not self.active_accounts:
+                raise RuntimeError("No active Instagram sessions available")
+            self.waiters.append(waiter)
+            self._dispatch()
+        return waiter
+    
+    def _claim(self, lease: "SessionLease") -> Optional[concurrent.futures.Future]:
+        """
+        Count a granted lease's request against the shared rate limit. Runs
+        without self.lock: the transaction may wait on another worker's.
+        Returns None once counted. If another worker used the account up
+        (the scheduler's fleet-wide counts are up to a keepalive tick old), it
+        goes back until its limit clears and the caller waits on the returned
+        queue entry, at the front.
+        """
+        try:
+            ok, wait = self.rate_limiter.reserve(lease.username)
+        except Exception:
+            self._hand_back(lease.username)
+            raise
+        
+        now = time.time()
+        with self.lock:
+            if ok:
+                self.scheduler.record_use(lease.username, now)
+                return None
+            self.leased.discard(lease.username)
+            self._reschedule(lease.username, not_before=now + wait)
+            waiter = concurrent.futures.Future()
+            self.waiters.appendleft(waiter)
+            self._dispatch()
+        return waiter
+    
+    def _hand_back(self, username: str):
+        """Return an account without reporting an outcome"""
+        with self.lock:
+            self.leased.discard(username)
+            self._reschedule(username)
+            self._dispatch()
+    
+    def _give_up(self, lease: Optional["SessionLease"], waiter: Optional[concurrent.futures.Future]):
+        """Leave the queue, handing back whatever account the abandoned checkout held"""
+        if waiter is not None:
+            lease = self._abandon(waiter)
+        if lease:
+            self._hand_back(lease.username)
+    
+    def _abandon(self, waiter: concurrent.futures.Future) -> Optional["SessionLease"]:
+        """Leave the queue; returns a lease that was granted in the meantime"""
+        with self.lock:
+            if waiter.cancel():
+                try:
+                    self.waiters.remove(waiter)
+                except ValueError:
+                    pass
+                return None
+        return waiter.result()
+    
+    def _busy_error(self) -> SessionBusyError:
+        with self.lock:
+            return SessionBusyError(self._next_ready_in())
+    
+    def acquire(self, timeout: float) -> "SessionLease":
+        """
+        Check out an account for one request. Waits in a fair queue until an
+        account is free and within its rate limit, or raises SessionBusyError
+        once the timeout passes. The lease must be released with the outcome.
+        """
+        give_up_at = time.monotonic() + timeout
+        if not self.initialized:
+            self.initialize_sessions(timeout)
+        self.sync_with_broker()
+        
+        waiter = self._enqueue()
+        while True:
+            remaining = give_up_at - time.monotonic()
+            if remaining <= 0:
+                # One last look: an account may have been granted in the meantime
+                lease = self._abandon(waiter)
+                if lease is None:
+                    raise self._busy_error()
+            else:
+                with self.lock:
+                    wake_in = min(remaining, self._next_ready_in())
+                try:
+                    lease = waiter.result(timeout=wake_in)
+                except concurrent.futures.TimeoutError:
+                    # A rate limit window may have opened without any release
+                    with self.lock:
+                        self._dispatch()
+                    continue
             
-            # Check rate limits
-            if not self.rate_limiter.can_make_request(best_username):
-                # Try to find an alternative session
-                for username in active_sessions.keys():
-                    if self.rate_limiter.can_make_request(username):
-                        best_username = username
-                        break
+            waiter = self._claim(lease)
+            if waiter is None:
+                return lease
+    
+    async def aacquire(self, timeout: float) -> "SessionLease":
+        """Async variant of acquire; neither waiting nor the shared limiter blocks the event loop"""
+        give_up_at = time.monotonic() + timeout
+        if not self.initialized:
+            await sync_to_async(self.initialize_sessions, thread_sensitive=False)(timeout)
+        self.sync_with_broker()
+        
+        waiter = self._enqueue()
+        claim = None
+        try:
+            while True:
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    lease = self._abandon(waiter)
+                    if lease is None:
+                        raise self._busy_error()
                 else:
-                    # All sessions are rate limited, wait for the best one
-                    self.rate_limiter.wait_if_needed(best_username)
-            
-            return best_username, active_sessions[best_username]
+                    with self.lock:
+                        wake_in = min(remaining, self._next_ready_in())
+                    try:
+                        # shield: timing out must not cancel the shared queue entry
+                        lease = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(waiter)), wake_in)
+                    except asyncio.TimeoutError:
+                        with self.lock:
+                            self._dispatch()
+                        continue
+                
+                claim = _reserve_executor.submit(self._claim, lease)
+                waiter = await asyncio.shield(asyncio.wrap_future(claim))
+                claim = None
+                if waiter is None:
+                    return lease
+        except asyncio.CancelledError:
+            if claim is not None:
+                # The reservation finishes in its thread (even if this loop goes away); undo it there
+                claim.add_done_callback(lambda f: f.exception() or self._give_up(lease, f.result()))
+            else:
+                self._give_up(None, waiter)
+            raise
     
-    def record_usage(self, username: str, success: bool = True):
-        """Record usage statistics"""
+    def release(self, username: str, success: bool = True, failure: Optional[str] = None):
+        """Return a leased account and wake the next waiter"""
+        self.record_usage(username, success=success, failure=failure)
+        with self.lock:
+            self.leased.discard(username)
+            self._reschedule(username)
+            self._dispatch()
+    
+    def get_best_session(self) -> Tuple[str, instaloader.Instaloader]:
+        """Get the best available session considering rate limits (backward compatibility)"""
+        lease = self.acquire(timeout=CHECKOUT_TIMEOUT)
+        # Legacy callers never report back, so hand the account straight back
+        self._hand_back(lease.username)
+        return lease.username, lease.session
+    
+    def active_session_count(self) -> int:
+        """Number of accounts currently able to serve requests"""
+        with self.lock:
+            return len(self.active_accounts)
+    
+    def record_usage(self, username: str, success: bool = True, failure: Optional[str] = None):
+        """Record usage statistics and feed the outcome to the account's circuit breaker"""
+        failure = failure or CircuitBreaker.TRANSIENT
+        if success:
+            self.health.confirm(username, force=False)
+        elif failure == CircuitBreaker.LOGIN_REQUIRED:
+            self.health.invalidate(username)
+        
         with self.lock:
             if username in self.account_status:
                 self.account_status[username]['last_used'] = time.time()
                 self.account_status[username]['request_count'] += 1
                 
-                if not success:
-                    # Mark as temporarily inactive on failure
-                    self.account_status[username]['active'] = False
-                    self.account_status[username]['retry_after'] = time.time() + 1800  # 30 minutes
-        
-        self.rate_limiter.record_request(username)
+                breaker = self._breaker(username)
+                if success:
+                    breaker.record_success()
+                else:
+                    breaker.record_failure(failure)
+                self._sync_status(username)
+    
+    def circuit_stats(self) -> Dict[str, Dict]:
+        with self.lock:
+            return {username: breaker.to_dict() for username, breaker in self.breakers.items()}
     
     def refresh_inactive_sessions(self):
-        """Periodically try to reactivate failed sessions"""
-        current_time = time.time()
-        
-        for username, status in self.account_status.items():
-            if not status['active'] and current_time > status.get('retry_after', 0):
-                account = next((acc for acc in self.accounts if acc['username'] == username), None)
-                if account:
-                    logger.info(f"Attempting to reactivate session for {username}")
-                    session = self.try_login(account)
-                    if session:
-                        with self.lock:
-                            self.sessions[username] = session
-                            self.account_status[username]['active'] = True
-                            self.account_status[username]['request_count'] = 0
-                        logger.info(f"Session reactivated for {username}")
+        """
+        Have every open circuit probed now instead of after its cooldown.
+        Returns straight away: the probes (and any logins) run on the
+        keepalive thread.
+        """
+        # Only the broker logs in; take the role over if its process is gone
+        if not self.session_broker.try_acquire():
+            self.sync_with_broker(force=True)
+        with self.lock:
+            for breaker in self.breakers.values():
+                breaker.expedite()
+        self.start_keepalive()
+        self.probe_wakeup.set()
 
 # Global instance
 _session_manager = InstagramSessionManager()
 
+def _reset_after_fork():
+    """
+    A process forked from one that already warmed up (gunicorn --preload)
+    inherits the manager's state and sessions but none of its threads, and
+    possibly a lock some thread was holding. Start it over with a fresh
+    manager, warming up again if the parent had.
+    """
+    global _session_manager
+    warm_up = _session_manager.warm_up_thread is not None
+    inherited_lock = _session_manager.session_broker.lock_file
+    if inherited_lock not in (None, True):
+        # Our copy of the parent's broker lock; closing it leaves the role with the parent
+        inherited_lock.close()
+    _session_manager = InstagramSessionManager()
+    if warm_up:
+        _session_manager.start_warm_up()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 def get_session_manager() -> InstagramSessionManager:
     """Get the global session manager instance"""
     return _session_manager
@@ -355,7 +818,15 @@ def initialize_instagram_sessions():
     """Initialize Instagram sessions (call this at Django startup)"""
     _session_manager.initialize_sessions()
 
+def start_instagram_warm_up():
+    """Start logging Instagram accounts in the background without blocking startup"""
+    _session_manager.start_warm_up()
+
 def get_instagram_session_with_tracking():
     """Get Instagram session with usage tracking"""
     username, session = _session_manager.get_best_session()
-    return username, session
\ No newline at end of file
+    return username, session
+
+async def acquire_instagram_session(timeout: float = CHECKOUT_TIMEOUT) -> SessionLease:
+    """Lease an Instagram session for one request; release it with the outcome"""
+    return await _session_manager.aacquire(timeout)
@@ -0,0 +1,132 @@
+import time
+import threading
+import logging
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from .deadline import Deadline
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Configuration
+JOB_WORKERS = getattr(settings, "DOWNLOAD_JOB_WORKERS", 4)
+JOB_STALE_SECONDS = getattr(settings, "DOWNLOAD_JOB_STALE_SECONDS", 300)
+JOB_RETENTION_SECONDS = getattr(settings, "DOWNLOAD_JOB_RETENTION_SECONDS", 3600)
+JOB_DEADLINE = getattr(settings, "DOWNLOAD_JOB_DEADLINE", 120)
+SWEEP_INTERVAL = 30
+
+def _get_model():
+    # Imported lazily so this module can load before the app registry is ready
+    from utilities.models import MediaJob
+    return MediaJob
+
+class DownloadJobQueue:
+    """
+    Local worker pool for media resolution jobs, backed by the MediaJob table.
+    Jobs are claimed with a conditional UPDATE so each runs once even when
+    several processes share the SQLite database - no external broker needed.
+    """
+
+    def __init__(self, workers: int):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="download-job")
+        self.sweeper = None
+        self.lock = threading.Lock()
+        # Jobs queued or running in this process, so the sweeper doesn't queue them again
+        self.held = set()
+
+    def start(self):
+        """Start the sweeper that picks up orphaned and stuck jobs"""
+        with self.lock:
+            if self.sweeper is None:
+                self.sweeper = threading.Thread(target=self._sweep_loop, name="download-job-sweeper", daemon=True)
+                self.sweeper.start()
+
+    async def submit(self, url: str, expected_type: str, is_staff: bool = False):
+        """Create a job and hand it to the local pool; returns immediately"""
+        self.start()
+        job = await _get_model().objects.acreate(url=url, expected_type=expected_type, is_staff=is_staff)
+        self._enqueue(job.id)
+        return job
+
+    def _enqueue(self, job_id):
+        with self.lock:
+            if job_id in self.held:
+                return
+            self.held.add(job_id)
+        self.executor.submit(self._run, job_id)
+
+    def _claim(self, job_id) -> bool:
+        MediaJob = _get_model()
+        claimed = MediaJob.objects.filter(
+            id=job_id, status=MediaJob.STATUS_PENDING
+        ).update(status=MediaJob.STATUS_RUNNING, updated_at=timezone.now())
+        return claimed == 1
+
+    def _run(self, job_id):
+        # Imported here to avoid a circular import with the views module
+        from .views import resolve_download
+
+        MediaJob = _get_model()
+        try:
+            if not self._claim(job_id):
+                return
+
+            job = MediaJob.objects.get(id=job_id)
+            started = time.monotonic()
+            result = async_to_sync(resolve_download)(job.url, job.expected_type, job.is_staff, Deadline(JOB_DEADLINE))
+            MediaJob.objects.filter(id=job_id).update(
+                status=MediaJob.STATUS_DONE, result=result, updated_at=timezone.now()
+            )
+            logger.info(f"Job {job_id} finished in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            MediaJob.objects.filter(id=job_id).update(
+                status=MediaJob.STATUS_DONE,
+                result={'error': 'An unexpected error occurred. Please try again later.'},
+                updated_at=timezone.now()
+            )
+        finally:
+            with self.lock:
+                self.held.discard(job_id)
+            close_old_connections()
+
+    def sweep(self):
+        """Requeue jobs stuck in a dead worker, pick up pending ones and drop old results"""
+        MediaJob = _get_model()
+        now = timezone.now()
+
+        MediaJob.objects.filter(
+            status=MediaJob.STATUS_RUNNING,
+            updated_at__lt=now - timedelta(seconds=JOB_STALE_SECONDS)
+        ).update(status=MediaJob.STATUS_PENDING, updated_at=now)
+
+        # Pending jobs a few seconds old were orphaned by a restart (or queued by a busy process);
+        # ones still waiting in our own pool are left where they are
+        orphaned = MediaJob.objects.filter(
+            status=MediaJob.STATUS_PENDING,
+            updated_at__lt=now - timedelta(seconds=SWEEP_INTERVAL)
+        ).values_list('id', flat=True)
+        for job_id in orphaned:
+            self._enqueue(job_id)
+
+        MediaJob.objects.filter(
+            status=MediaJob.STATUS_DONE,
+            updated_at__lt=now - timedelta(seconds=JOB_RETENTION_SECONDS)
+        ).delete()
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(SWEEP_INTERVAL)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"Job sweep failed: {e}")
+            finally:
+                close_old_connections()
+
+# Global instance
+job_queue = DownloadJobQueue(JOB_WORKERS)
@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import tempfile
+import logging
+from typing import Dict, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+JOB_SUFFIX = ".job"
+RUNNING_SUFFIX = ".running"
+RESULT_SUFFIX = ".result"
+
+class LoginQueue:
+    """
+    File-backed queue of browser re-auth jobs, shared by the web workers
+    (which request logins) and the login worker process (which runs them).
+    There is at most one job per account: asking for a login that is already
+    queued or running just waits for that one. A job is claimed by renaming
+    it, so two login workers never run the same job.
+    """
+
+    def __init__(self, queue_dir: str):
+        self.queue_dir = queue_dir
+        os.makedirs(queue_dir, exist_ok=True)
+
+    def _path(self, username: str, suffix: str) -> str:
+        return os.path.join(self.queue_dir, f"{username}{suffix}")
+
+    def request(self, username: str):
+        """Queue a browser login for an account unless one is already pending"""
+        if os.path.exists(self._path(username, RUNNING_SUFFIX)):
+            return
+        try:
+            fd = os.open(self._path(username, JOB_SUFFIX), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return
+        with os.fdopen(fd, "w") as f:
+            json.dump({'requested_at': time.time()}, f)
+        logger.info(f"Queued browser login for {username}")
+
+    def claim(self) -> Optional[str]:
+        """Take the oldest queued job (login worker only)"""
+        jobs = []
+        for name in os.listdir(self.queue_dir):
+            if name.endswith(JOB_SUFFIX):
+                try:
+                    jobs.append((os.path.getmtime(os.path.join(self.queue_dir, name)), name))
+                except FileNotFoundError:
+                    continue
+
+        for _, name in sorted(jobs):
+            username = name[:-len(JOB_SUFFIX)]
+            try:
+                os.rename(self._path(username, JOB_SUFFIX), self._path(username, RUNNING_SUFFIX))
+            except FileNotFoundError:
+                continue  # claimed by another worker
+            return username
+        return None
+
+    def finish(self, username: str, ok: bool, error: Optional[str] = None):
+        """Publish a job's outcome and take it off the queue"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.queue_dir, prefix=".result-")
+        with os.fdopen(fd, "w") as f:
+            json.dump({'ok': ok, 'error': error, 'finished_at': time.time()}, f)
+        os.replace(tmp_path, self._path(username, RESULT_SUFFIX))
+        try:
+            os.remove(self._path(username, RUNNING_SUFFIX))
+        except FileNotFoundError:
+            pass
+
+    def result(self, username: str) -> Optional[Dict]:
+        """The last published outcome for an account"""
+        try:
+            with open(self._path(username, RESULT_SUFFIX), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def wait(self, username: str, since: float, timeout: float, poll_interval: float = 1) -> Optional[Dict]:
+        """Wait for a login that finished after `since`; None if none did within the timeout"""
+        give_up_at = time.monotonic() + timeout
+        while True:
+            result = self.result(username)
+            if result and result['finished_at'] >= since:
+                return result
+            if time.monotonic() > give_up_at:
+                return None
+            time.sleep(poll_interval)
+
+    def requeue_stale(self):
+        """Put back jobs a crashed login worker had claimed"""
+        for name in os.listdir(self.queue_dir):
+            if name.endswith(RUNNING_SUFFIX):
+                username = name[:-len(RUNNING_SUFFIX)]
+                os.replace(self._path(username, RUNNING_SUFFIX), self._path(username, JOB_SUFFIX))
+                logger.info(f"Requeued interrupted browser login for {username}")
+
+    def stats(self) -> Dict[str, int]:
+        names = os.listdir(self.queue_dir)
+        return {
+            'queued': sum(1 for name in names if name.endswith(JOB_SUFFIX)),
+            'running': sum(1 for name in names if name.endswith(RUNNING_SUFFIX)),
+        }
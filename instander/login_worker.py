@@ -0,0 +1,163 @@
+import os
+import time
+import random
+import logging
+from typing import Optional
+import instaloader
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+LOGIN_URL = "https://www.instagram.com/accounts/login/"
+
+def _process_tree_rss_mb(root_pid: int) -> Optional[float]:
+    """Resident memory of a process and all its descendants (Linux only)"""
+    if not os.path.isdir("/proc"):
+        return None
+
+    children = {}
+    rss_pages = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # The command name may contain spaces; fields resume after ')'
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (FileNotFoundError, ProcessLookupError, IndexError):
+            continue
+        pid, ppid = int(entry), int(fields[1])
+        children.setdefault(ppid, []).append(pid)
+        rss_pages[pid] = int(fields[21])
+
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+class BrowserLoginWorker:
+    """
+    Owns one headless Chrome and reuses it for consecutive logins, clearing
+    cookies in between. The browser is restarted after max_logins logins or
+    when its process tree grows past max_rss_mb, and closed when idle.
+    """
+
+    def __init__(self, session_dir: str, max_logins: int, max_rss_mb: float, idle_seconds: float):
+        self.session_dir = session_dir
+        self.max_logins = max_logins
+        self.max_rss_mb = max_rss_mb
+        self.idle_seconds = idle_seconds
+        self.driver = None
+        self.logins = 0
+        self.last_used = 0.0
+
+    def _start_browser(self):
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+
+        self.driver = webdriver.Chrome(options=options)
+        self.logins = 0
+        logger.info("Started login browser")
+
+    def stop(self):
+        """Quit the browser if it's running"""
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Login browser did not quit cleanly: {e}")
+        self.driver = None
+
+    def browser_rss_mb(self) -> Optional[float]:
+        """Memory used by chromedriver and every Chrome process under it"""
+        if self.driver is None:
+            return 0.0
+        return _process_tree_rss_mb(self.driver.service.process.pid)
+
+    def _recycle_if_needed(self):
+        if self.driver is None:
+            return
+        rss = self.browser_rss_mb()
+        if self.logins >= self.max_logins or (rss is not None and rss > self.max_rss_mb):
+            logger.info(f"Restarting login browser after {self.logins} logins ({rss or 0:.0f} MB)")
+            self.stop()
+
+    def close_if_idle(self):
+        """Give the browser's memory back while no logins are queued"""
+        if self.driver is not None and time.monotonic() - self.last_used > self.idle_seconds:
+            logger.info("Closing idle login browser")
+            self.stop()
+
+    def login(self, username: str, password: str) -> bool:
+        """Log in through the browser and save the cookies as an instaloader session file"""
+        session_file = os.path.join(self.session_dir, f"{username}.session")
+        if self.driver is None:
+            self._start_browser()
+        driver = self.driver
+        wait = WebDriverWait(driver, 20)
+        self.logins += 1
+
+        try:
+            logger.info(f"Starting Selenium login for {username}")
+            driver.get(LOGIN_URL)
+
+            # Wait for login form to load
+            username_field = wait.until(EC.presence_of_element_located((By.NAME, "username")))
+            password_field = driver.find_element(By.NAME, "password")
+
+            # Short random pauses so typing doesn't look scripted
+            time.sleep(random.uniform(0.5, 1.5))
+            username_field.send_keys(username)
+            time.sleep(random.uniform(0.5, 1))
+            password_field.send_keys(password)
+            time.sleep(random.uniform(0.5, 1))
+
+            driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+
+            # Done as soon as Instagram sets the session cookie or asks for a checkpoint
+            try:
+                wait.until(lambda d: d.get_cookie("sessionid") or "challenge" in d.current_url)
+            except TimeoutException:
+                logger.error(f"Login failed for {username} - still on login page")
+                return False
+
+            if "challenge" in driver.current_url:
+                logger.warning(f"Instagram checkpoint detected for {username}")
+                return False
+
+            L = instaloader.Instaloader()
+            for cookie in driver.get_cookies():
+                L.context._session.cookies.set(cookie['name'], cookie['value'])
+            L.save_session_to_file(session_file)
+            logger.info(f"Session saved successfully for {username}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Selenium login failed for {username}: {e}")
+            # The browser may be wedged; start a fresh one for the next job
+            self.stop()
+            return False
+
+        finally:
+            self.last_used = time.monotonic()
+            if self.driver is not None:
+                # The next account must not inherit this one's cookies
+                try:
+                    self.driver.delete_all_cookies()
+                except Exception:
+                    self.stop()
+            self._recycle_if_needed()
@@ -0,0 +1,148 @@
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse, parse_qs
+from django.conf import settings
+from django.core.cache import cache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Configuration
+LOCAL_CACHE_SIZE = getattr(settings, "MEDIA_CACHE_LOCAL_SIZE", 512)
+SHARED_CACHE_PREFIX = "media_meta:v1:"
+DEFAULT_TIMEOUT = getattr(settings, "MEDIA_CACHE_DEFAULT_TIMEOUT", 300)
+MAX_TIMEOUT = getattr(settings, "MEDIA_CACHE_MAX_TIMEOUT", 24 * 3600)
+EXPIRY_MARGIN = getattr(settings, "MEDIA_CACHE_EXPIRY_MARGIN", 600)
+NEGATIVE_CACHE_PREFIX = "media_neg:v1:"
+FACEBOOK_LINK_CACHE_PREFIX = "fb_link:v1:"
+NEGATIVE_TIMEOUT = getattr(settings, "MEDIA_NEGATIVE_CACHE_TIMEOUT", 600)
+
+# --- CDN Expiry ---
+def media_url_expiry(url: Optional[str]) -> Optional[int]:
+    """Unix expiry of a signed Instagram/Facebook CDN URL (the hex oe= parameter)"""
+    if not url:
+        return None
+    try:
+        values = parse_qs(urlparse(url).query).get("oe")
+        return int(values[0], 16) if values else None
+    except ValueError:
+        return None
+
+def media_expiry(media: Iterable[Dict]) -> Optional[int]:
+    """Earliest CDN expiry across every URL in a media list"""
+    expiries = [
+        expiry
+        for item in media
+        for expiry in (media_url_expiry(item.get("url")), media_url_expiry(item.get("thumbnail")))
+        if expiry is not None
+    ]
+    return min(expiries) if expiries else None
+
+def media_cache_timeout(media: List[Dict]) -> int:
+    """
+    Cache TTL for a media list: earliest CDN expiry minus a safety margin,
+    or the default when no URL carries an expiry. 0 means don't cache.
+    """
+    expiry = media_expiry(media)
+    if expiry is None:
+        return DEFAULT_TIMEOUT
+    return max(0, min(int(expiry - time.time() - EXPIRY_MARGIN), MAX_TIMEOUT))
+
+class LocalLRUCache:
+    """Small bounded in-process LRU with per-entry expiry"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a live entry and mark it most recently used"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expires_at: float):
+        """Store an entry, evicting the least recently used ones"""
+        with self.lock:
+            self.entries[key] = (expires_at, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str):
+        """Drop an entry if present"""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+class TwoTierCache:
+    """In-process LRU in front of the shared Django cache, with hit/miss counters per tier"""
+
+    def __init__(self, prefix: str, local_size: int):
+        self.prefix = prefix
+        self.local = LocalLRUCache(local_size)
+        self.counters = {
+            'local': {'hits': 0, 'misses': 0},
+            'shared': {'hits': 0, 'misses': 0},
+        }
+        self.lock = threading.Lock()
+
+    def _count(self, tier: str, outcome: str):
+        with self.lock:
+            self.counters[tier][outcome] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look a key up in the local tier, then the shared tier"""
+        value = self.local.get(key)
+        if value is not None:
+            self._count('local', 'hits')
+            return value
+        self._count('local', 'misses')
+
+        # Shared entries carry their absolute expiry so the local copy never outlives them
+        entry = cache.get(self.prefix + key)
+        if not entry:
+            self._count('shared', 'misses')
+            return None
+
+        self._count('shared', 'hits')
+        self.local.set(key, entry['data'], entry['expires_at'])
+        return entry['data']
+
+    def set(self, key: str, value: Any, timeout: int):
+        """Write a value through to both tiers"""
+        expires_at = time.time() + timeout
+        self.local.set(key, value, expires_at)
+        cache.set(self.prefix + key, {'data': value, 'expires_at': expires_at}, timeout)
+
+    def delete(self, key: str):
+        """Remove a key from both tiers"""
+        self.local.delete(key)
+        cache.delete(self.prefix + key)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Snapshot of hit/miss counters per tier"""
+        with self.lock:
+            stats = {tier: dict(counts) for tier, counts in self.counters.items()}
+        stats['local']['size'] = len(self.local)
+        return stats
+
+# Global instances
+media_cache = TwoTierCache(SHARED_CACHE_PREFIX, LOCAL_CACHE_SIZE)
+negative_cache = TwoTierCache(NEGATIVE_CACHE_PREFIX, LOCAL_CACHE_SIZE)
+facebook_link_cache = TwoTierCache(FACEBOOK_LINK_CACHE_PREFIX, LOCAL_CACHE_SIZE)
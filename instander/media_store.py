@@ -0,0 +1,97 @@
+import time
+import threading
+import logging
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import close_old_connections
+from .media_cache import media_expiry, EXPIRY_MARGIN
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Configuration
+FRESH_SECONDS = getattr(settings, "MEDIA_STORE_FRESH_SECONDS", 3600)
+REFRESH_WORKERS = getattr(settings, "MEDIA_STORE_REFRESH_WORKERS", 2)
+
+# Background refreshes run on their own small pool, outside any request's event loop
+_refresh_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="media-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def _get_model():
+    # Imported lazily so this module can load before the app registry is ready
+    from utilities.models import MediaMetadata
+    return MediaMetadata
+
+async def load_media(key: str) -> Optional[Tuple[List[Dict], bool]]:
+    """
+    Look a key up in the persistent store.
+    Returns (media, is_stale) or None when missing or when its CDN links are expiring.
+    """
+    try:
+        record = await _get_model().objects.filter(key=key).afirst()
+    except Exception as e:
+        logger.warning(f"Media store lookup failed for {key}: {e}")
+        return None
+
+    if record is None:
+        return None
+
+    now = datetime.now(timezone.utc)
+    if record.expires_at and record.expires_at <= now + timedelta(seconds=EXPIRY_MARGIN):
+        # Stale links are useless - treat as a miss and fetch synchronously
+        return None
+
+    is_stale = (now - record.fetched_at).total_seconds() > FRESH_SECONDS
+    return record.media, is_stale
+
+async def save_media(key: str, platform: str, media: List[Dict], typename: str = "") -> None:
+    """Persist a freshly fetched media list"""
+    expiry = media_expiry(media)
+    thumbnail = next((item.get("thumbnail") or item.get("url") for item in media), None)
+    try:
+        await _get_model().objects.aupdate_or_create(
+            key=key,
+            defaults={
+                'platform': platform,
+                'typename': typename or "",
+                'media': media,
+                'thumbnail': thumbnail,
+                'fetched_at': datetime.now(timezone.utc),
+                'expires_at': datetime.fromtimestamp(expiry, timezone.utc) if expiry else None,
+            }
+        )
+    except Exception as e:
+        logger.warning(f"Failed to persist media for {key}: {e}")
+
+async def delete_media(key: str) -> None:
+    """Forget a stored entry (e.g. the post went private or was removed)"""
+    try:
+        await _get_model().objects.filter(key=key).adelete()
+    except Exception as e:
+        logger.warning(f"Failed to delete stored media for {key}: {e}")
+
+def schedule_refresh(key: str, refresh: Callable[[], Awaitable]) -> bool:
+    """Refresh a stale entry in the background; at most one refresh per key at a time"""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+
+    def run():
+        started = time.monotonic()
+        try:
+            async_to_sync(refresh)()
+            logger.info(f"Refreshed stale media for {key} in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {key}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+            close_old_connections()
+
+    _refresh_executor.submit(run)
+    return True
@@ -0,0 +1,95 @@
+import os
+import time
+import sqlite3
+import threading
+import logging
+from typing import Dict, Iterable, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class SharedRateLimiter:
+    """
+    Sliding-window rate limiter shared by every worker process on the host.
+    Each request is a row in a small SQLite database; checks and reservations
+    run in a BEGIN IMMEDIATE transaction, so workers enforce one limit per
+    account atomically without an external service.
+    """
+
+    def __init__(self, path: str, limit: int, window: float, min_interval: float):
+        self.path = path
+        self.limit = limit
+        self.window = window
+        self.min_interval = min_interval
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._transaction() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS requests (account TEXT NOT NULL, ts REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS requests_account_ts ON requests (account, ts)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self.local.db = db
+        return db
+
+    def _transaction(self):
+        limiter = self
+
+        class Transaction:
+            def __enter__(self):
+                self.db = limiter._connection()
+                self.db.execute("BEGIN IMMEDIATE")
+                return self.db
+
+            def __exit__(self, exc_type, exc, tb):
+                self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+        return Transaction()
+
+    def _wait_for(self, count: int, oldest: float, newest: float, now: float) -> float:
+        if count >= self.limit:
+            return max(0.0, oldest + self.window - now)
+        if newest:
+            return max(0.0, newest + self.min_interval - now)
+        return 0.0
+
+    def try_acquire(self, account: str) -> Tuple[bool, float]:
+        """Atomically reserve one request for an account. Returns (ok, seconds to wait)."""
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("DELETE FROM requests WHERE account = ? AND ts <= ?", (account, now - self.window))
+            count, oldest, newest = db.execute(
+                "SELECT COUNT(*), MIN(ts), MAX(ts) FROM requests WHERE account = ?", (account,)
+            ).fetchone()
+            wait = self._wait_for(count, oldest or 0, newest or 0, now)
+            if wait > 0:
+                return False, wait
+            db.execute("INSERT INTO requests (account, ts) VALUES (?, ?)", (account, now))
+            return True, 0.0
+
+    def headroom(self, accounts: Iterable[str]) -> Dict[str, Tuple[int, float]]:
+        """(requests left in the window, seconds until the next one is allowed) per account"""
+        accounts = list(accounts)
+        now = time.time()
+        result = {account: (self.limit, 0.0) for account in accounts}
+        if not accounts:
+            return result
+
+        placeholders = ",".join("?" * len(accounts))
+        rows = self._connection().execute(
+            f"SELECT account, COUNT(*), MIN(ts), MAX(ts) FROM requests "
+            f"WHERE ts > ? AND account IN ({placeholders}) GROUP BY account",
+            (now - self.window, *accounts)
+        ).fetchall()
+        for account, count, oldest, newest in rows:
+            result[account] = (max(0, self.limit - count), self._wait_for(count, oldest, newest, now))
+        return result
+
+    def time_until_available(self, account: str) -> float:
+        """Seconds until an account may make its next request"""
+        return self.headroom([account])[account][1]
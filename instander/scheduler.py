@@ -0,0 +1,111 @@
+import heapq
+import itertools
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+class AccountScheduler:
+    """
+    Priority queue of accounts that are free to serve a request, ordered by
+    when each is next allowed to and then by how many requests it made in
+    the current window - estimated from this process's own usage and the
+    last fleet-wide counts from the shared limiter, whichever is higher.
+    Checkout and return are O(log n); stale heap entries are skipped lazily
+    and dropped once they outnumber the live ones.
+    Not thread-safe: the session manager calls it under its own lock.
+    """
+
+    def __init__(self, limit: int, window: float, min_interval: float):
+        self.limit = limit
+        self.window = window
+        self.min_interval = min_interval
+        self.heap = []
+        # username -> sequence number of its live heap entry
+        self.entries: Dict[str, int] = {}
+        self.uses: Dict[str, deque] = {}
+        # username -> (requests in the window, next allowed at) across every worker
+        self.fleet: Dict[str, Tuple[int, float]] = {}
+        self.counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, username: str) -> bool:
+        return username in self.entries
+
+    def _recent_uses(self, username: str, now: float) -> deque:
+        uses = self.uses.setdefault(username, deque())
+        while uses and uses[0] <= now - self.window:
+            uses.popleft()
+        return uses
+
+    def _available_at(self, username: str, now: float) -> float:
+        uses = self._recent_uses(username, now)
+        fleet_available_at = self.fleet.get(username, (0, 0.0))[1]
+        if len(uses) >= self.limit:
+            return max(uses[0] + self.window, fleet_available_at)
+        if uses:
+            return max(uses[-1] + self.min_interval, fleet_available_at)
+        return fleet_available_at
+
+    def _used(self, username: str, now: float) -> int:
+        return max(len(self._recent_uses(username, now)), self.fleet.get(username, (0, 0.0))[0])
+
+    def add(self, username: str, now: float, not_before: float = 0.0):
+        """Make an account schedulable (or re-key it if it already is)"""
+        available_at = max(not_before, self._available_at(username, now))
+        seq = next(self.counter)
+        self.entries[username] = seq
+        heapq.heappush(self.heap, (available_at, self._used(username, now), seq, username))
+        if len(self.heap) > 2 * len(self.entries):
+            self._compact()
+
+    def _compact(self):
+        # Re-keys with no checkouts in between (fleet refreshes on an idle worker)
+        # would otherwise pile up stale entries; rebuilding keeps the heap O(accounts)
+        self.heap = [entry for entry in self.heap if self.entries.get(entry[3]) == entry[2]]
+        heapq.heapify(self.heap)
+
+    def discard(self, username: str):
+        """Take an account out of scheduling; its heap entry goes stale"""
+        self.entries.pop(username, None)
+
+    def _peek(self):
+        while self.heap:
+            available_at, _, seq, username = self.heap[0]
+            if self.entries.get(username) == seq:
+                return available_at, username
+            heapq.heappop(self.heap)
+        return None
+
+    def pop_ready(self, now: float) -> Optional[str]:
+        """Remove and return the best account that may make a request now"""
+        top = self._peek()
+        if top is None or top[0] > now:
+            return None
+        heapq.heappop(self.heap)
+        del self.entries[top[1]]
+        return top[1]
+
+    def next_ready_in(self, now: float) -> Optional[float]:
+        """Seconds until the best scheduled account is expected to be usable; None if none is scheduled"""
+        top = self._peek()
+        return None if top is None else max(0.0, top[0] - now)
+
+    def record_use(self, username: str, at: float):
+        self._recent_uses(username, at).append(at)
+
+    def update_fleet(self, headroom: Dict[str, Tuple[int, float]], now: float):
+        """
+        Fold in the shared limiter's headroom - (requests left, seconds until
+        the next is allowed) per account - and re-key the scheduled accounts
+        """
+        for username, (left, wait) in headroom.items():
+            self.fleet[username] = (self.limit - left, now + wait)
+            if username in self.entries:
+                self.add(username, now)
+
+    def forget(self, username: str):
+        """Drop an account and its usage history"""
+        self.discard(username)
+        self.uses.pop(username, None)
+        self.fleet.pop(username, None)
@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import logging
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows - every process logs in for itself
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".broker.lock"
+
+class SessionBroker:
+    """
+    Elects one process per host to log Instagram accounts in. The broker
+    writes cookie jars to the session files and records each account's
+    state in a manifest; every other worker attaches to those files and
+    watches the manifest's mtime for changes instead of logging in itself.
+    """
+
+    def __init__(self, session_dir: str):
+        self.session_dir = session_dir
+        self.lock_path = os.path.join(session_dir, LOCK_NAME)
+        self.manifest_path = os.path.join(session_dir, MANIFEST_NAME)
+        self.lock_file = None
+        # Parallel logins in the broker publish concurrently
+        self.publish_lock = threading.Lock()
+
+    @property
+    def is_broker(self) -> bool:
+        return self.lock_file is not None
+
+    def try_acquire(self) -> bool:
+        """Become the broker if no live process holds the role (the OS drops the lock on exit)"""
+        if self.lock_file is not None:
+            return True
+        if fcntl is None:
+            self.lock_file = True
+            return True
+
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self.lock_file = lock_file
+        logger.info(f"Process {os.getpid()} is the Instagram session broker")
+        return True
+
+    def manifest_mtime(self) -> float:
+        """Cheap change check for workers"""
+        try:
+            return os.stat(self.manifest_path).st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    def read_manifest(self) -> Dict:
+        """Current account states; empty when nothing was published yet"""
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'generation': 0, 'accounts': {}}
+
+    def publish(self, username: str, ready: bool, retry_after: Optional[float] = None):
+        """Record an account's state after a login attempt (broker only)"""
+        with self.publish_lock:
+            manifest = self.read_manifest()
+            manifest['generation'] = manifest.get('generation', 0) + 1
+            manifest['accounts'][username] = {
+                'ready': ready,
+                'updated_at': time.time(),
+                'retry_after': retry_after,
+            }
+
+            # Write-then-rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.session_dir, prefix=".manifest-")
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, self.manifest_path)
+
+    def wait_for_manifest(self, timeout: float) -> Dict:
+        """Wait for the broker to publish at least one ready account"""
+        give_up_at = time.monotonic() + timeout
+        while True:
+            manifest = self.read_manifest()
+            if any(state['ready'] for state in manifest['accounts'].values()):
+                return manifest
+            if time.monotonic() > give_up_at:
+                return manifest
+            time.sleep(0.2)
@@ -0,0 +1,74 @@
+import os
+import time
+import threading
+import logging
+from typing import Dict, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class SessionHealth:
+    """
+    Remembers when each account's session was last confirmed good - by a
+    successful request, a fresh login or a keepalive probe. The time is the
+    mtime of a small marker file next to the session file, so every worker
+    process on the host can record and read it atomically without locking.
+    """
+
+    def __init__(self, session_dir: str, fresh_seconds: float, touch_interval: float = 60):
+        self.session_dir = session_dir
+        self.fresh_seconds = fresh_seconds
+        # Successful requests confirm at most this often per account and process
+        self.touch_interval = touch_interval
+        self.last_touch = {}
+        self.lock = threading.Lock()
+
+    def _marker_path(self, username: str) -> str:
+        return os.path.join(self.session_dir, f"{username}.ok")
+
+    def confirm(self, username: str, force: bool = True):
+        """Record that the account's session just worked"""
+        now = time.time()
+        with self.lock:
+            if not force and now - self.last_touch.get(username, 0) < self.touch_interval:
+                return
+            self.last_touch[username] = now
+
+        path = self._marker_path(username)
+        try:
+            with open(path, "a"):
+                os.utime(path, (now, now))
+        except OSError as e:
+            logger.warning(f"Could not record session health for {username}: {e}")
+
+    def invalidate(self, username: str):
+        """Forget the last confirmation so the session is probed before it's trusted again"""
+        with self.lock:
+            self.last_touch.pop(username, None)
+        try:
+            os.remove(self._marker_path(username))
+        except FileNotFoundError:
+            pass
+
+    def confirmed_at(self, username: str) -> Optional[float]:
+        """When the session was last confirmed good, or None"""
+        try:
+            return os.path.getmtime(self._marker_path(username))
+        except FileNotFoundError:
+            return None
+
+    def age(self, username: str) -> float:
+        """Seconds since the last confirmation (infinite if never confirmed)"""
+        confirmed_at = self.confirmed_at(username)
+        return time.time() - confirmed_at if confirmed_at else float("inf")
+
+    def is_fresh(self, username: str) -> bool:
+        """Confirmed recently enough to be used without a probe request"""
+        return self.age(username) < self.fresh_seconds
+
+    def stats(self, usernames) -> Dict[str, Optional[float]]:
+        """Seconds since each account was last confirmed good"""
+        return {
+            username: round(age) if age != float("inf") else None
+            for username, age in ((u, self.age(u)) for u in usernames)
+        }
@@ -166,4 +166,118 @@ EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = 'your-email@example.com'
-EMAIL_HOST_PASSWORD = 'your-app-password'
\ No newline at end of file
+EMAIL_HOST_PASSWORD = 'your-app-password'
+
+# Instagram / Facebook fetch pipeline
+# Blocking instaloader calls run in a bounded thread pool so async views
+# never block the event loop while Instagram is slow.
+INSTALOADER_MAX_WORKERS = int(os.getenv("INSTALOADER_MAX_WORKERS", "16"))
+
+# Per-process LRU kept in front of the shared Django cache for media metadata
+MEDIA_CACHE_LOCAL_SIZE = int(os.getenv("MEDIA_CACHE_LOCAL_SIZE", "512"))
+
+# Media metadata TTLs follow the CDN links' own expiry (oe=) minus a margin;
+# results without an expiry use the default
+MEDIA_CACHE_DEFAULT_TIMEOUT = int(os.getenv("MEDIA_CACHE_DEFAULT_TIMEOUT", "300"))
+MEDIA_CACHE_MAX_TIMEOUT = int(os.getenv("MEDIA_CACHE_MAX_TIMEOUT", str(24 * 3600)))
+MEDIA_CACHE_EXPIRY_MARGIN = int(os.getenv("MEDIA_CACHE_EXPIRY_MARGIN", "600"))
+
+# Missing/private/unsupported posts are negative-cached for this long
+MEDIA_NEGATIVE_CACHE_TIMEOUT = int(os.getenv("MEDIA_NEGATIVE_CACHE_TIMEOUT", "600"))
+
+# Persistent media metadata store: entries older than this are served
+# immediately while a background refresh fetches a new copy
+MEDIA_STORE_FRESH_SECONDS = int(os.getenv("MEDIA_STORE_FRESH_SECONDS", "3600"))
+MEDIA_STORE_REFRESH_WORKERS = int(os.getenv("MEDIA_STORE_REFRESH_WORKERS", "2"))
+
+# Background download jobs (MediaJob table, local worker pool - no broker)
+DOWNLOAD_JOB_WORKERS = int(os.getenv("DOWNLOAD_JOB_WORKERS", "4"))
+DOWNLOAD_JOB_STALE_SECONDS = int(os.getenv("DOWNLOAD_JOB_STALE_SECONDS", "300"))
+DOWNLOAD_JOB_RETENTION_SECONDS = int(os.getenv("DOWNLOAD_JOB_RETENTION_SECONDS", "3600"))
+
+# Warm yt-dlp worker processes (replaced after YTDLP_POOL_MAX_JOBS extractions)
+YTDLP_POOL_SIZE = int(os.getenv("YTDLP_POOL_SIZE", "2"))
+YTDLP_POOL_MAX_JOBS = int(os.getenv("YTDLP_POOL_MAX_JOBS", "200"))
+
+# How long a request may queue for a free Instagram account before it gets
+# a fast "busy, retry in N s" answer
+INSTAGRAM_SESSION_CHECKOUT_TIMEOUT = float(os.getenv("INSTAGRAM_SESSION_CHECKOUT_TIMEOUT", "15"))
+
+# Per-account Instagram request budget, shared by every worker on the host
+# through a small SQLite sliding-window log
+INSTAGRAM_RATE_LIMIT_DB = os.getenv("INSTAGRAM_RATE_LIMIT_DB", os.path.join(BASE_DIR, "sessions", "ratelimit.sqlite3"))
+INSTAGRAM_RATE_LIMIT_PER_HOUR = int(os.getenv("INSTAGRAM_RATE_LIMIT_PER_HOUR", "150"))
+INSTAGRAM_RATE_LIMIT_MIN_INTERVAL = float(os.getenv("INSTAGRAM_RATE_LIMIT_MIN_INTERVAL", "3"))
+
+# Workers that aren't the login broker wait this long for it to publish sessions
+INSTAGRAM_BROKER_WAIT_TIMEOUT = float(os.getenv("INSTAGRAM_BROKER_WAIT_TIMEOUT", "60"))
+
+# Opt in to logging Instagram accounts in from a background thread when an
+# ASGI/WSGI server or runserver starts (parallel logins; requests are served
+# as soon as one account is ready). Off by default; warm_sessions does it on demand
+INSTAGRAM_WARM_UP_ON_STARTUP = os.getenv("INSTAGRAM_WARM_UP_ON_STARTUP", "false").lower() == "true"
+INSTAGRAM_WARM_UP_WORKERS = int(os.getenv("INSTAGRAM_WARM_UP_WORKERS", "4"))
+
+# Sessions confirmed good (by a request, login or probe) within this window are
+# used without a probe request; a background keepalive re-validates them
+# halfway through it and logs dead ones in again
+INSTAGRAM_SESSION_FRESH_SECONDS = int(os.getenv("INSTAGRAM_SESSION_FRESH_SECONDS", str(6 * 3600)))
+INSTAGRAM_SESSION_KEEPALIVE_INTERVAL = int(os.getenv("INSTAGRAM_SESSION_KEEPALIVE_INTERVAL", "600"))
+
+# Browser (Selenium) logins run only in the run_login_worker process. Web
+# workers queue a login and wait this long for it; the worker reuses one
+# Chrome and restarts it after N logins or past the memory cap
+INSTAGRAM_BROWSER_LOGIN_TIMEOUT = float(os.getenv("INSTAGRAM_BROWSER_LOGIN_TIMEOUT", "180"))
+INSTAGRAM_LOGIN_WORKER_MAX_LOGINS = int(os.getenv("INSTAGRAM_LOGIN_WORKER_MAX_LOGINS", "20"))
+INSTAGRAM_LOGIN_WORKER_MAX_RSS_MB = int(os.getenv("INSTAGRAM_LOGIN_WORKER_MAX_RSS_MB", "600"))
+INSTAGRAM_LOGIN_WORKER_IDLE_SECONDS = int(os.getenv("INSTAGRAM_LOGIN_WORKER_IDLE_SECONDS", "300"))
+
+# Per-account circuit breakers: transient errors open an account's circuit
+# after this many consecutive failures (rate limits and logouts open it at
+# once); open circuits are probed in the background every few seconds
+INSTAGRAM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("INSTAGRAM_BREAKER_FAILURE_THRESHOLD", "3"))
+INSTAGRAM_BREAKER_PROBE_INTERVAL = float(os.getenv("INSTAGRAM_BREAKER_PROBE_INTERVAL", "10"))
+
+# Hedged Instagram fetches: when an attempt runs past this percentile of
+# recent latencies, race a second one on another account. Hedges are capped
+# at INSTAGRAM_HEDGE_BUDGET_PERCENT of fetches
+INSTAGRAM_HEDGE_ENABLED = os.getenv("INSTAGRAM_HEDGE_ENABLED", "false").lower() == "true"
+INSTAGRAM_HEDGE_PERCENTILE = float(os.getenv("INSTAGRAM_HEDGE_PERCENTILE", "95"))
+INSTAGRAM_HEDGE_BUDGET_PERCENT = float(os.getenv("INSTAGRAM_HEDGE_BUDGET_PERCENT", "10"))
+
+# Overall time budgets (seconds). Checkout, retries, backoff, yt-dlp and
+# upstream timeouts are all capped by the request's remaining budget, and a
+# request that can't finish in time fails early with a "try again" message
+DOWNLOAD_REQUEST_DEADLINE = float(os.getenv("DOWNLOAD_REQUEST_DEADLINE", "25"))
+DOWNLOAD_BATCH_DEADLINE = float(os.getenv("DOWNLOAD_BATCH_DEADLINE", "60"))
+DOWNLOAD_JOB_DEADLINE = float(os.getenv("DOWNLOAD_JOB_DEADLINE", "120"))
+PROXY_REQUEST_DEADLINE = float(os.getenv("PROXY_REQUEST_DEADLINE", "30"))
+# Per-HTTP-call timeout for instaloader (its default is 300s)
+INSTAGRAM_REQUEST_TIMEOUT = float(os.getenv("INSTAGRAM_REQUEST_TIMEOUT", "30"))
+
+# Disk cache for proxied images and downloads, shared by all workers and
+# keyed by media identity (CDN path without signature/expiry), LRU-evicted
+MEDIA_FILE_CACHE_DIR = os.getenv("MEDIA_FILE_CACHE_DIR", os.path.join(BASE_DIR, "media_cache"))
+MEDIA_FILE_CACHE_MAX_BYTES = int(os.getenv("MEDIA_FILE_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+MEDIA_FILE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("MEDIA_FILE_CACHE_MAX_ENTRY_BYTES", str(200 * 1024 ** 2)))
+
+# Preset widths proxy_image resizes to (?w= is rounded up to one of them)
+# and the encoder quality for resized WebP/AVIF/JPEG variants
+PROXY_IMAGE_WIDTHS = tuple(int(w) for w in os.getenv("PROXY_IMAGE_WIDTHS", "320,640,1080").split(","))
+PROXY_IMAGE_QUALITY = int(os.getenv("PROXY_IMAGE_QUALITY", "75"))
+
+# Shared keep-alive HTTP client for proxied media: (connect, read) timeouts
+# in seconds, connections kept per host and number of hosts with a pool
+MEDIA_HTTP_CONNECT_TIMEOUT = float(os.getenv("MEDIA_HTTP_CONNECT_TIMEOUT", "3.05"))
+MEDIA_HTTP_READ_TIMEOUT = float(os.getenv("MEDIA_HTTP_READ_TIMEOUT", "20"))
+MEDIA_HTTP_POOL_MAXSIZE = int(os.getenv("MEDIA_HTTP_POOL_MAXSIZE", "16"))
+MEDIA_HTTP_POOL_HOSTS = int(os.getenv("MEDIA_HTTP_POOL_HOSTS", "32"))
+
+# Async client behind the ASGI proxy views: most sockets open at once per
+# process and how many idle keep-alive connections it holds on to
+MEDIA_HTTP_ASYNC_MAX_CONNECTIONS = int(os.getenv("MEDIA_HTTP_ASYNC_MAX_CONNECTIONS", "2000"))
+MEDIA_HTTP_ASYNC_MAX_KEEPALIVE = int(os.getenv("MEDIA_HTTP_ASYNC_MAX_KEEPALIVE", "128"))
+
+# Cross-worker coalescing of identical fetches: who is fetching each
+# post/video and the result they published, in a small SQLite table
+SINGLEFLIGHT_DB = os.getenv("SINGLEFLIGHT_DB", os.path.join(BASE_DIR, "sessions", "singleflight.sqlite3"))
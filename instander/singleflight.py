@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+import logging
+import concurrent.futures
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .exceptions import DeadlineExceeded, MediaUnavailableError, SessionBusyError
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FLIGHT_DB = getattr(settings, "SINGLEFLIGHT_DB", os.path.join(settings.BASE_DIR, "sessions", "singleflight.sqlite3"))
+
+def _error_to_dict(error: Exception) -> Dict:
+    data = {'type': type(error).__name__, 'message': str(error)}
+    if isinstance(error, MediaUnavailableError):
+        data.update(error.to_dict())
+    elif isinstance(error, SessionBusyError):
+        data['retry_after'] = error.retry_after
+    return data
+
+def _error_from_dict(data: Dict) -> Exception:
+    """Rebuild a failure another worker published, keeping the fields callers branch on"""
+    if data['type'] == 'MediaUnavailableError':
+        return MediaUnavailableError.from_dict(data)
+    if data['type'] == 'SessionBusyError':
+        return SessionBusyError(data['retry_after'])
+    if data['type'] == 'ValueError':
+        return ValueError(data['message'])
+    if data['type'] == 'RuntimeError':
+        return RuntimeError(data['message'])
+    return Exception(data['message'])
+
+class SharedFlights:
+    """
+    Cross-process half of SingleFlight: one row per key in a small SQLite
+    database records who is fetching it and, once done, the published result
+    or error. Claims run in BEGIN IMMEDIATE transactions, like the shared
+    rate limiter, so every worker on the host sees one leader per key.
+    """
+
+    RUNNING = "running"
+    DONE = "done"
+    ERROR = "error"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        db = self._connection()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS flights (key TEXT PRIMARY KEY, owner TEXT NOT NULL, "
+            "state TEXT NOT NULL, payload TEXT, expires REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self.local.db = db
+        return db
+
+    def claim(self, key: str, owner: str, lock_timeout: float) -> bool:
+        """Become the fetcher for a key unless a live one holds it"""
+        now = time.time()
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT state, expires FROM flights WHERE key = ?", (key,)).fetchone()
+            if row and row[0] == self.RUNNING and row[1] > now:
+                db.execute("COMMIT")
+                return False
+            db.execute(
+                "INSERT OR REPLACE INTO flights (key, owner, state, payload, expires) VALUES (?, ?, ?, NULL, ?)",
+                (key, owner, self.RUNNING, now + lock_timeout)
+            )
+            db.execute("COMMIT")
+            return True
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def publish(self, key: str, owner: str, state: str, payload: Any, ttl: float):
+        """Replace our claim with a result or error that waiters pick up"""
+        self._connection().execute(
+            "UPDATE flights SET state = ?, payload = ?, expires = ? WHERE key = ? AND owner = ?",
+            (state, json.dumps(payload), time.time() + ttl, key, owner)
+        )
+
+    def release(self, key: str, owner: str):
+        """Give a claim up without publishing anything (the next waiter fetches)"""
+        self._connection().execute("DELETE FROM flights WHERE key = ? AND owner = ?", (key, owner))
+
+    def outcome(self, key: str) -> Optional[Tuple[str, Any]]:
+        """(state, payload) of a published result or error; None while running or absent"""
+        row = self._connection().execute(
+            "SELECT state, payload, expires FROM flights WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[0] == self.RUNNING or row[2] <= time.time():
+            return None
+        return row[0], json.loads(row[1])
+
+_shared_flights = None
+_shared_flights_lock = threading.Lock()
+
+def _get_shared_flights() -> SharedFlights:
+    global _shared_flights
+    with _shared_flights_lock:
+        if _shared_flights is None:
+            _shared_flights = SharedFlights(FLIGHT_DB)
+        return _shared_flights
+
+async def _off_loop(func, *args):
+    """SQLite calls may wait on another worker's transaction; keep them off the event loop"""
+    return await sync_to_async(func, thread_sensitive=False)(*args)
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key so only one runs upstream.
+    Callers in this process wait on the leader's future; other workers see
+    the leader's claim in SharedFlights and pick up its published result
+    or error.
+    """
+
+    def __init__(self, name: str, lock_timeout: int = 90, result_ttl: int = 30, poll_interval: float = 0.25):
+        self.name = name
+        self.lock_timeout = lock_timeout
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.calls: Dict[str, concurrent.futures.Future] = {}
+        self.tasks = set()
+        self.lock = threading.Lock()
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn once per key; every concurrent caller gets the same result or error"""
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                # concurrent.futures so callers on other event loops can wait on it too
+                future = concurrent.futures.Future()
+                self.calls[key] = future
+            else:
+                self.coalesced += 1
+
+        if leader:
+            # Run as its own task so a disconnecting leader doesn't fail the waiters
+            task = asyncio.ensure_future(self._lead(key, fn, future))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        else:
+            logger.info(f"Coalescing {self.name} fetch for {key}")
+
+        waiter = asyncio.wrap_future(future)
+        # Callers that give up (deadline, disconnect) leave the outcome unread
+        waiter.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return await asyncio.shield(waiter)
+
+    async def _lead(self, key: str, fn: Callable[[], Awaitable[Any]], future: concurrent.futures.Future):
+        try:
+            result = await self._run_shared(key, fn)
+        except asyncio.CancelledError:
+            # The leader's event loop is going away (async_to_sync closes each
+            # call's loop). Waiters on other loops see it like someone else's
+            # deadline and lead the fetch themselves.
+            self._finish(key, future, error=DeadlineExceeded(f"{self.name} fetch (leader cancelled)"))
+            raise
+        except BaseException as e:
+            self._finish(key, future, error=e)
+        else:
+            self._finish(key, future, result=result)
+
+    def _finish(self, key: str, future: concurrent.futures.Future, result: Any = None,
+                error: Optional[BaseException] = None):
+        # Forget the key first, so a waiter that re-leads doesn't find this finished future
+        with self.lock:
+            self.calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def _run_shared(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flights = _get_shared_flights()
+        flight_key = f"{self.name}:{key}"
+        token = uuid.uuid4().hex
+        give_up_at = time.monotonic() + self.lock_timeout
+
+        while True:
+            if await _off_loop(flights.claim, flight_key, token, self.lock_timeout):
+                published = False
+                try:
+                    result = await fn()
+                except (DeadlineExceeded, asyncio.CancelledError):
+                    # The leading request ran out of time; that says nothing about the key
+                    raise
+                except Exception as e:
+                    await _off_loop(flights.publish, flight_key, token, SharedFlights.ERROR,
+                                    _error_to_dict(e), self.result_ttl)
+                    published = True
+                    raise
+                else:
+                    await _off_loop(flights.publish, flight_key, token, SharedFlights.DONE, result, self.result_ttl)
+                    published = True
+                    return result
+                finally:
+                    if not published:
+                        # Plain call: this may run while the task is being cancelled
+                        flights.release(flight_key, token)
+
+            # Another worker is fetching this key - wait for what it publishes
+            await asyncio.sleep(self.poll_interval)
+
+            outcome = await _off_loop(flights.outcome, flight_key)
+            if outcome is not None:
+                state, payload = outcome
+                if state == SharedFlights.DONE:
+                    with self.lock:
+                        self.coalesced += 1
+                    return payload
+                raise _error_from_dict(payload)
+
+            if time.monotonic() > give_up_at:
+                logger.warning(f"Timed out waiting for another worker's {self.name} fetch of {key}")
+                return await fn()
+
+    def stats(self) -> Dict[str, int]:
+        """Number of in-flight keys and calls that were coalesced"""
+        with self.lock:
+            return {'in_flight': len(self.calls), 'coalesced': self.coalesced}
@@ -23,6 +23,9 @@ urlpatterns = [
     path('download/reels/', views.download_instagram_reels, name='download_reels'),
     path('download/posts/', views.download_instagram_posts, name='download_posts'),
     path('download/facebook/', views.download_facebook_video, name='download_facebook'),
+    path('download/batch/', views.download_batch, name='download_batch'),
+    path('download/jobs/', views.submit_download_job, name='submit_download_job'),
+    path('download/jobs/<uuid:job_id>/', views.download_job_status, name='download_job_status'),
     path("proxy-image/", views.proxy_image, name="proxy_image"),
     path("download-image/", views.proxy_download, name="proxy_download"),
     path("download_all/", views.download_all_zip, name="download_all_zip"),
@@ -1,52 +1,78 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
 import json
+import asyncio
 import logging
+from asgiref.sync import sync_to_async
+from .insta_login import get_session_manager
 from .downloader import (
     is_instagram_url,
     is_facebook_url,
-    fetch_facebook_video,
+    download_key,
+    fetch_facebook_video_async,
     detect_content_type,
-    fetch_instagram_media,
+    fetch_instagram_media_async,
     check_instagram_health,
     refresh_sessions
 )
+from django.conf import settings
+from .exceptions import MediaUnavailableError, SessionBusyError, DeadlineExceeded
+from .deadline import Deadline
+from .jobs import job_queue
+from utilities.models import MediaJob
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Time budgets (seconds) for a whole request, enforced by every layer below the view
+REQUEST_DEADLINE = getattr(settings, "DOWNLOAD_REQUEST_DEADLINE", 25)
+BATCH_DEADLINE = getattr(settings, "DOWNLOAD_BATCH_DEADLINE", 60)
+PROXY_DEADLINE = getattr(settings, "PROXY_REQUEST_DEADLINE", 30)
+DEADLINE_ERROR = 'This is taking longer than expected, please try again in a moment'
+
 def home(request):
     """Home page view"""
     return render(request, 'index.html')
 
-@csrf_exempt
-def download_instagram_reels(request):
+def async_csrf_exempt(view_func):
+    """csrf_exempt for async views (Django 4.2's decorator hides the coroutine)"""
+    view_func.csrf_exempt = True
+    return view_func
+
+async def user_is_staff(request) -> bool:
+    """Resolve request.user.is_staff without touching the DB from the event loop"""
+    return await sync_to_async(lambda: request.user.is_staff)()
+
+@async_csrf_exempt
+async def download_instagram_reels(request):
     """Handle Instagram reels download"""
-    return handle_download(request, expected_type="reel")
+    return await handle_download(request, expected_type="reel")
 
-@csrf_exempt
-def download_instagram_posts(request):
+@async_csrf_exempt
+async def download_instagram_posts(request):
     """Handle Instagram posts download"""
-    return handle_download(request, expected_type="post")
+    return await handle_download(request, expected_type="post")
 
-@csrf_exempt
-def download_facebook_video(request):
+@async_csrf_exempt
+async def download_facebook_video(request):
     """Handle Facebook video download"""
-    return handle_download(request, expected_type="facebook")
+    return await handle_download(request, expected_type="facebook")
 
-def handle_download(request, expected_type):
+async def handle_download(request, expected_type):
     """
-    Enhanced download handler with better error handling and logging
+    Enhanced download handler with better error handling and logging.
+    Runs natively under ASGI so slow Instagram fetches don't hold a worker thread.
     """
     if request.method != 'POST':
         return JsonResponse({'error': 'Only POST method allowed'}, status=405)
 
     url = request.POST.get('url', '').strip()
     is_htmx = request.headers.get("HX-Request") == "true"
+    is_staff = await user_is_staff(request)
     
     # Log the request
     logger.info(f"Download request: type={expected_type}, url={url[:100]}...")
@@ -55,6 +81,15 @@ def handle_download(request, expected_type):
         context = {'error': 'No URL provided'}
         return render(request, 'partials/download_result.html' if is_htmx else 'download.html', context)
 
+    context = await resolve_download(url, expected_type, is_staff, Deadline(REQUEST_DEADLINE))
+    return render(request, 'partials/download_result.html' if is_htmx else 'download.html', context)
+
+async def resolve_download(url, expected_type, is_staff=False, deadline=None):
+    """
+    Fetch media for a URL and build the download_result.html context.
+    Shared by the inline download views and the background job workers.
+    Fails with a "try again" error rather than overrunning the deadline.
+    """
     try:
         if is_instagram_url(url):
             # Handle Instagram content
@@ -71,7 +106,7 @@ def handle_download(request, expected_type):
                 }
             else:
                 try:
-                    media = fetch_instagram_media(url)
+                    media = await fetch_instagram_media_async(url, deadline)
                     context = {
                         "status": "success",
                         "type": "instagram",
@@ -81,6 +116,27 @@ def handle_download(request, expected_type):
                         "media_count": len(media)
                     }
                     logger.info(f"Successfully fetched {len(media)} media items from Instagram")
+                
+                except MediaUnavailableError as e:
+                    # Missing/private/unsupported posts (often straight from the negative cache)
+                    context = {
+                        'error': e.message,
+                        'reason': e.reason
+                    }
+                
+                except SessionBusyError as e:
+                    # Every account is leased or throttled - fail fast with a retry hint
+                    context = {
+                        'error': f'We are busy right now, please retry in {max(1, round(e.retry_after))} seconds',
+                        'retry_after': e.retry_after
+                    }
+                
+                except DeadlineExceeded as e:
+                    logger.warning(f"Instagram download timed out: {e}")
+                    context = {
+                        'error': DEADLINE_ERROR,
+                        'timed_out': True
+                    }
                     
                 except Exception as e:
                   # Provide user-friendly error messages
@@ -94,14 +150,14 @@ def handle_download(request, expected_type):
                   
                   context = {
                       'error': error_msg,
-                      'technical_error': str(e) if request.user.is_staff else None
+                      'technical_error': str(e) if is_staff else None
                   }
         elif is_facebook_url(url):
           content_type = detect_content_type(url)
           logger.info(f"Detected facebook content type: {content_type}")
           # Handle Facebook content
           try:
-              media = fetch_facebook_video(url)
+              media = await fetch_facebook_video_async(url, deadline)
               context = {
                   "status": "success",
                   "type": "facebook",
@@ -111,6 +167,12 @@ def handle_download(request, expected_type):
               }
               logger.info("Successfully fetched Facebook video")
               logger.info(context)
+          except DeadlineExceeded as e:
+              logger.warning(f"Facebook download timed out: {e}")
+              context = {
+                  'error': DEADLINE_ERROR,
+                  'timed_out': True
+              }
           except Exception as e:
               # Provide user-friendly error messages
               error_msg = str(e)
@@ -123,7 +185,7 @@ def handle_download(request, expected_type):
               
               context = {
                   'error': error_msg,
-                  'technical_error': str(e) if request.user.is_staff else None 
+                  'technical_error': str(e) if is_staff else None 
               }
         else:
             # Invalid URL or unsupported platform
@@ -132,52 +194,363 @@ def handle_download(request, expected_type):
                 'supported_platforms': ['Instagram Posts', 'Instagram Reels', 'Facebook Videos']
             }
         logger.info(context)
-        return render(request, 'partials/download_result.html' if is_htmx else 'download.html', context)
+        return context
 
     except Exception as e:
-        logger.error(f"Unexpected error in handle_download: {e}")
-        context = {
+        logger.error(f"Unexpected error in resolve_download: {e}")
+        return {
             'error': 'An unexpected error occurred. Please try again later.',
-            'technical_error': str(e) if request.user.is_staff else None
+            'technical_error': str(e) if is_staff else None
         }
 
-        
-        return render(request, 'partials/download_result.html' if is_htmx else 'download.html', context)
+
+# --- Background Download Jobs ---
+JOB_TYPES = ("reel", "post", "facebook")
+
+@async_csrf_exempt
+async def submit_download_job(request):
+    """Queue a download and return at once; the result is polled from download_job_status"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method allowed'}, status=405)
+
+    url = request.POST.get('url', '').strip()
+    expected_type = request.POST.get('type', 'post')
+    is_htmx = request.headers.get("HX-Request") == "true"
+
+    if not url or expected_type not in JOB_TYPES:
+        context = {'error': 'No URL provided' if not url else 'Unsupported download type'}
+        if is_htmx:
+            return render(request, 'partials/download_result.html', context)
+        return JsonResponse(context, status=400)
+
+    job = await job_queue.submit(url, expected_type, await user_is_staff(request))
+    logger.info(f"Queued download job {job.id}: type={expected_type}, url={url[:100]}...")
+
+    if is_htmx:
+        return render(request, 'partials/download_pending.html', {'job': job})
+    return JsonResponse({'job_id': str(job.id), 'status': job.status}, status=202)
+
+async def download_job_status(request, job_id):
+    """Render a job's result once it's done, or the polling placeholder until then"""
+    job = await MediaJob.objects.filter(id=job_id).afirst()
+    is_htmx = request.headers.get("HX-Request") == "true"
+
+    if job is None:
+        context = {'error': 'Download request expired, please try again'}
+        if is_htmx:
+            return render(request, 'partials/download_result.html', context)
+        return JsonResponse(context, status=404)
+
+    if job.status != MediaJob.STATUS_DONE:
+        if is_htmx:
+            return render(request, 'partials/download_pending.html', {'job': job})
+        return JsonResponse({'job_id': str(job.id), 'status': job.status})
+
+    if is_htmx:
+        return render(request, 'partials/download_result.html', job.result)
+    return JsonResponse({'job_id': str(job.id), 'status': job.status, 'result': job.result})
+
+# --- Batch Downloads ---
+BATCH_MAX_URLS = 50
+FACEBOOK_BATCH_CONCURRENCY = 4
+
+@async_csrf_exempt
+async def download_batch(request):
+    """
+    Resolve a list of URLs in parallel, de-duplicated by shortcode/video id.
+    Results stream back as they complete: NDJSON lines, or HTMX fragments.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method allowed'}, status=405)
+
+    urls = request.POST.getlist('urls[]') or request.POST.get('urls', '').split()
+    is_htmx = request.headers.get("HX-Request") == "true"
+
+    # Group duplicate links so each post is fetched once
+    groups = {}
+    for url in urls:
+        url = url.strip()
+        if url:
+            groups.setdefault(download_key(url), []).append(url)
+
+    if not groups:
+        return JsonResponse({'error': 'No URLs provided'}, status=400)
+    if len(groups) > BATCH_MAX_URLS:
+        return JsonResponse({'error': f'Too many URLs requested (max {BATCH_MAX_URLS})'}, status=400)
+
+    is_staff = await user_is_staff(request)
+    deadline = Deadline(BATCH_DEADLINE)
+    logger.info(f"Batch download request: {len(urls)} urls, {len(groups)} unique")
+
+    # Spread Instagram fetches over every active account; rate limits apply per account
+    instagram_slots = asyncio.Semaphore(max(1, get_session_manager().active_session_count()))
+    facebook_slots = asyncio.Semaphore(FACEBOOK_BATCH_CONCURRENCY)
+
+    async def resolve(key, group):
+        url = group[0]
+        if is_facebook_url(url):
+            async with facebook_slots:
+                context = await resolve_download(url, "facebook", is_staff, deadline)
+        else:
+            async with instagram_slots:
+                context = await resolve_download(url, "post", is_staff, deadline)
+        return key, group, context
+
+    async def stream():
+        tasks = [asyncio.ensure_future(resolve(key, group)) for key, group in groups.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                key, group, context = await next_done
+                if is_htmx:
+                    yield render_to_string(
+                        'partials/batch_item.html',
+                        {**context, 'key': key, 'source_url': group[0]},
+                        request
+                    )
+                else:
+                    yield json.dumps({'key': key, 'urls': group, **context}) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    content_type = 'text/html' if is_htmx else 'application/x-ndjson'
+    return StreamingHttpResponse(stream(), content_type=content_type)
 
 # --- Proxy Functions ---
 import requests
-from django.http import HttpResponse
-from django.views.decorators.cache import cache_page
+from django.http import HttpResponse, FileResponse
+from PIL import Image
+from .disk_cache import disk_cache, canonical_media_id
+from .http_client import media_http, async_media_http
+from .image_variants import snap_width, negotiate_format, render_variant
+from .byte_ranges import RangeNotSatisfiable, parse_byte_range, if_range_matches, iter_file_range, aiter_file_range
+import httpx
+from django.core.handlers.asgi import ASGIRequest
+
+def _read_within(response, deadline, chunk_size=65536):
+    """Read an upstream body chunk by chunk, giving up once the deadline passes"""
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            deadline.check("upstream read")
+            yield chunk
+    finally:
+        # Back to the pool when fully read; a half-read connection is dropped
+        response.close()
+
+def _stream_upstream(response, chunk_size=65536):
+    """Relay an upstream body, releasing its pooled connection even if the client goes away"""
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    finally:
+        response.close()
 
-@cache_page(60 * 15)  # Cache for 15 minutes
-def proxy_image(request):
-    """Proxy images to avoid CORS issues with caching"""
+def _serve_cached(cached, **kwargs):
+    """FileResponse (sendfile where the server supports it) for a disk cache hit; None if it was just evicted"""
+    data_path, meta = cached
+    try:
+        file = open(data_path, "rb")
+    except FileNotFoundError:
+        return None
+    return FileResponse(file, content_type=meta['content_type'], **kwargs)
+
+def _tee_to_cache(chunks, writer):
+    """Pass chunks through while writing them to the disk cache; only a complete body is committed"""
+    completed = False
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+            yield chunk
+        completed = True
+    finally:
+        if completed:
+            writer.commit()
+        else:
+            writer.abort()
+
+async def _astream_upstream(response, chunk_size=65536):
+    """
+    Relay an upstream body without buffering it. The next chunk is only read
+    once the server has taken the last one, so a slow client slows the
+    upstream read (backpressure) instead of filling memory.
+    """
+    try:
+        async for chunk in response.aiter_raw(chunk_size):
+            yield chunk
+    finally:
+        await response.aclose()
+
+async def _atee_to_cache(chunks, writer):
+    """Async _tee_to_cache; chunk writes land in the page cache, the commit (may evict) runs in a thread"""
+    completed = False
+    try:
+        async for chunk in chunks:
+            writer.write(chunk)
+            yield chunk
+        completed = True
+    finally:
+        await chunks.aclose()
+        if completed:
+            await sync_to_async(writer.commit, thread_sensitive=False)()
+        else:
+            writer.abort()
+
+async def _aread_cached(cached):
+    """Bytes of a (small) disk cache entry, read in a worker thread; None if it was just evicted"""
+    def read():
+        try:
+            with open(cached[0], "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+    return await sync_to_async(read, thread_sensitive=False)()
+
+def _original_image(url, cache_key, deadline):
+    """Full-size image bytes and content type, from the disk cache or upstream"""
+    cached = disk_cache.get(cache_key)
+    if cached:
+        data_path, meta = cached
+        try:
+            with open(data_path, "rb") as f:
+                return f.read(), meta['content_type']
+        except FileNotFoundError:
+            pass
+
+    headers = {'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8'}
+    response = media_http.get(url, deadline, stream=True, headers=headers)
+    response.raise_for_status()
+
+    content_type = response.headers.get("Content-Type", "image/jpeg")
+    body = b"".join(_read_within(response, deadline))
+    disk_cache.put(cache_key, body, content_type)
+    return body, content_type
+
+def _image_variant(request, url):
+    """(width, format, cache key) for a proxy_image request; format is None for the original. Raises ValueError."""
+    width = request.GET.get("w")
+    requested_format = request.GET.get("format")
+    if not (width or requested_format):
+        return None, None, canonical_media_id(url)
+    width = snap_width(int(width)) if width else None
+    fmt = negotiate_format(request.headers.get("Accept"), requested_format)
+    return width, fmt, canonical_media_id(url, variant=f"w{width or 'full'}.{fmt}")
+
+def _image_response(body, content_type, fmt):
+    proxy_response = HttpResponse(body, content_type=content_type)
+    proxy_response['Cache-Control'] = 'public, max-age=3600'  # Cache for 1 hour
+    if fmt:
+        proxy_response['Vary'] = 'Accept'
+    return proxy_response
+
+def _proxy_image_sync(request):
+    """
+    Proxy images to avoid CORS issues, cached on disk by media identity.
+    With ?w= the image is downscaled to that width (rounded up to a preset)
+    and re-encoded as AVIF/WebP/JPEG per ?format= or the Accept header.
+    """
     url = request.GET.get("url")
     if not url:
         return HttpResponse("Missing URL parameter", status=400)
 
     try:
-        # Add headers to mimic a real browser request
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': 'https://www.instagram.com/',
-            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8'
-        }
+        width, fmt, cache_key = _image_variant(request, url)
+    except ValueError:
+        return HttpResponse("Invalid width", status=400)
+
+    cached = disk_cache.get(cache_key)
+    if cached:
+        proxy_response = _serve_cached(cached)
+        if proxy_response:
+            # FileResponse would name the inline image after the cache key
+            del proxy_response['Content-Disposition']
+            proxy_response['Cache-Control'] = 'public, max-age=3600'
+            if fmt:
+                proxy_response['Vary'] = 'Accept'
+            return proxy_response
+
+    deadline = Deadline(PROXY_DEADLINE)
+    try:
+        body, content_type = _original_image(url, canonical_media_id(url), deadline)
+
+        if fmt:
+            try:
+                body, content_type = render_variant(body, width, fmt)
+                disk_cache.put(cache_key, body, content_type)
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                # Not something Pillow can decode; the original still displays
+                logger.warning(f"Could not resize proxied image: {e}")
+
+        return _image_response(body, content_type, fmt)
         
-        response = requests.get(url, stream=True, headers=headers, timeout=30)
+    except (requests.exceptions.Timeout, DeadlineExceeded):
+        return HttpResponse("Request timeout", status=504)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Proxy image error: {e}")
+        return HttpResponse("Failed to fetch image", status=500)
+    except Exception as e:
+        logger.error(f"Unexpected proxy image error: {e}")
+        return HttpResponse("Internal error", status=500)
+
+async def _aoriginal_image(url, cache_key, deadline):
+    """Async _original_image"""
+    cached = disk_cache.get(cache_key)
+    if cached:
+        body = await _aread_cached(cached)
+        if body is not None:
+            return body, cached[1]['content_type']
+
+    headers = {'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8'}
+    response = await deadline.wait_for(async_media_http.stream(url, deadline, headers=headers), "upstream request")
+    try:
         response.raise_for_status()
-        
         content_type = response.headers.get("Content-Type", "image/jpeg")
-        
-        # Create response with proper headers
-        proxy_response = HttpResponse(response.content, content_type=content_type)
-        proxy_response['Cache-Control'] = 'public, max-age=3600'  # Cache for 1 hour
-        
-        return proxy_response
-        
-    except requests.exceptions.Timeout:
+        body = await deadline.wait_for(response.aread(), "upstream read")
+    finally:
+        await response.aclose()
+
+    await sync_to_async(disk_cache.put, thread_sensitive=False)(cache_key, body, content_type)
+    return body, content_type
+
+async def proxy_image(request):
+    """
+    Async proxy_image for ASGI servers: waiting on the CDN holds no thread,
+    and disk reads and resizing run in worker threads. Under WSGI the
+    thread-based view is used (see _proxy_image_sync for the parameters).
+    """
+    if not isinstance(request, ASGIRequest):
+        return await sync_to_async(_proxy_image_sync)(request)
+
+    url = request.GET.get("url")
+    if not url:
+        return HttpResponse("Missing URL parameter", status=400)
+
+    try:
+        width, fmt, cache_key = _image_variant(request, url)
+    except ValueError:
+        return HttpResponse("Invalid width", status=400)
+
+    cached = disk_cache.get(cache_key)
+    if cached:
+        body = await _aread_cached(cached)
+        if body is not None:
+            return _image_response(body, cached[1]['content_type'], fmt)
+
+    deadline = Deadline(PROXY_DEADLINE)
+    try:
+        body, content_type = await _aoriginal_image(url, canonical_media_id(url), deadline)
+
+        if fmt:
+            try:
+                body, content_type = await sync_to_async(render_variant, thread_sensitive=False)(body, width, fmt)
+                await sync_to_async(disk_cache.put, thread_sensitive=False)(cache_key, body, content_type)
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                # Not something Pillow can decode; the original still displays
+                logger.warning(f"Could not resize proxied image: {e}")
+
+        return _image_response(body, content_type, fmt)
+
+    except (httpx.TimeoutException, DeadlineExceeded):
         return HttpResponse("Request timeout", status=504)
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Proxy image error: {e}")
         return HttpResponse("Failed to fetch image", status=500)
     except Exception as e:
@@ -187,57 +560,130 @@ def proxy_image(request):
 from urllib.parse import urlparse, unquote
 import os
 
-def proxy_download(request):
-    """Proxy downloads with enhanced error handling"""
+def _download_filename(url, content_type):
+    """Filename from the URL path, or a generic one based on the content type"""
+    try:
+        path = urlparse(unquote(url)).path
+        filename = os.path.basename(path)
+        if not filename or '.' not in filename:
+            # Generate filename based on content type
+            if "video" in content_type:
+                filename = f"video_{int(time.time())}.mp4"
+            elif "image" in content_type:
+                filename = f"image_{int(time.time())}.jpg"
+            else:
+                filename = f"media_{int(time.time())}"
+    except:
+        filename = f"download_{int(time.time())}"
+    return filename
+
+def _media_etag(cache_key):
+    """Strong ETag for a proxied file; the bytes behind a canonical media id never change"""
+    return f'"{cache_key[:32]}"'
+
+def _range_not_satisfiable(content_range):
+    response = HttpResponse("Requested range not satisfiable", status=416)
+    response["Content-Range"] = content_range
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+def _cached_byte_range(request, etag, size):
+    """The single range to serve from a cached file of `size` bytes (None: all of it). Raises RangeNotSatisfiable."""
+    if not if_range_matches(request.headers.get("If-Range"), etag):
+        return None
+    return parse_byte_range(request.headers.get("Range"), size)
+
+def _serve_cached_download(request, url, cached, etag):
+    """Whole-file FileResponse or a 206 slice for a disk cache hit; None if it was just evicted"""
+    data_path, meta = cached
+    try:
+        file = open(data_path, "rb")
+    except FileNotFoundError:
+        return None
+    size = os.fstat(file.fileno()).st_size
+    content_type = meta['content_type']
+    filename = _download_filename(url, content_type)
+
+    try:
+        byte_range = _cached_byte_range(request, etag, size)
+    except RangeNotSatisfiable:
+        file.close()
+        return _range_not_satisfiable(f"bytes */{size}")
+
+    if byte_range is None:
+        download_response = FileResponse(file, as_attachment=True, filename=filename, content_type=content_type)
+    else:
+        start, end = byte_range
+        download_response = StreamingHttpResponse(iter_file_range(file, start, end), status=206, content_type=content_type)
+        download_response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        download_response["Content-Length"] = str(end - start + 1)
+        download_response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    download_response["Accept-Ranges"] = "bytes"
+    download_response["ETag"] = etag
+    return download_response
+
+def _proxy_download_sync(request):
+    """
+    Proxy downloads with Range/If-Range support. Repeat downloads are served
+    from the disk cache; ranges of uncached files are forwarded upstream.
+    """
     url = request.GET.get("url")
     if not url:
         return HttpResponse("Missing URL parameter", status=400)
 
+    cache_key = canonical_media_id(url)
+    etag = _media_etag(cache_key)
+    cached = disk_cache.get(cache_key)
+    if cached:
+        download_response = _serve_cached_download(request, url, cached, etag)
+        if download_response:
+            return download_response
+
+    # Bounds the wait for the upstream response; the body itself may stream for longer
+    deadline = Deadline(PROXY_DEADLINE)
     try:
-        # Add headers to mimic a real browser request
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': 'https://www.instagram.com/',
-        }
+        # Media is already compressed; asking for it as-is keeps the cached
+        # bytes, Content-Length and Range offsets all about the same body
+        headers = {'Accept-Encoding': 'identity'}
+        range_header = request.headers.get("Range")
+        if range_header and if_range_matches(request.headers.get("If-Range"), etag):
+            headers['Range'] = range_header
         
         # Stream the response to handle large files
-        response = requests.get(url, stream=True, headers=headers, timeout=60)
+        response = media_http.get(url, deadline, stream=True, headers=headers)
+        if response.status_code == 416:
+            response.close()
+            return _range_not_satisfiable(response.headers.get("Content-Range", "bytes */*"))
         response.raise_for_status()
 
-        # Extract filename from URL
-        try:
-            path = urlparse(unquote(url)).path
-            filename = os.path.basename(path)
-            if not filename or '.' not in filename:
-                # Generate filename based on content type
-                content_type = response.headers.get("Content-Type", "")
-                if "video" in content_type:
-                    filename = f"video_{int(time.time())}.mp4"
-                elif "image" in content_type:
-                    filename = f"image_{int(time.time())}.jpg"
-                else:
-                    filename = f"media_{int(time.time())}"
-        except:
-            filename = f"download_{int(time.time())}"
-
         # Get content type
         content_type = response.headers.get("Content-Type", "application/octet-stream")
+        filename = _download_filename(url, content_type)
 
-        # Create download response
-        download_response = HttpResponse(
-            response.iter_content(chunk_size=8192),
-            content_type=content_type
-        )
+        chunks = _stream_upstream(response)
+        if response.status_code == 206:
+            # A slice of the file: passed through but not cached
+            download_response = StreamingHttpResponse(chunks, status=206, content_type=content_type)
+            download_response["Content-Range"] = response.headers.get("Content-Range")
+        else:
+            # Stream to the client and into the disk cache at the same time
+            download_response = StreamingHttpResponse(
+                _tee_to_cache(chunks, disk_cache.writer(cache_key, content_type)),
+                content_type=content_type
+            )
         download_response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        download_response["ETag"] = etag
+        if response.status_code == 206 or response.headers.get("Accept-Ranges") == "bytes":
+            download_response["Accept-Ranges"] = "bytes"
         
-        # Add content length if available
+        # Add content length if available (iter_content decodes a body sent encoded anyway)
         content_length = response.headers.get("Content-Length")
-        if content_length:
+        if content_length and not response.headers.get("Content-Encoding"):
             download_response["Content-Length"] = content_length
 
         return download_response
 
-    except requests.exceptions.Timeout:
+    except (requests.exceptions.Timeout, DeadlineExceeded):
         return HttpResponse("Download timeout - file may be too large", status=504)
     except requests.exceptions.RequestException as e:
         logger.error(f"Proxy download error: {e}")
@@ -246,6 +692,114 @@ def proxy_download(request):
         logger.error(f"Unexpected proxy download error: {e}")
         return HttpResponse("Download error occurred", status=500)
 
+async def _aserve_cached_download(request, url, cached, etag):
+    """Async _serve_cached_download: the file is streamed in chunks read by worker threads"""
+    data_path, meta = cached
+    try:
+        file = open(data_path, "rb")
+    except FileNotFoundError:
+        return None
+    size = os.fstat(file.fileno()).st_size
+    content_type = meta['content_type']
+
+    try:
+        byte_range = _cached_byte_range(request, etag, size)
+    except RangeNotSatisfiable:
+        file.close()
+        return _range_not_satisfiable(f"bytes */{size}")
+
+    start, end = byte_range or (0, size - 1)
+    download_response = StreamingHttpResponse(
+        aiter_file_range(file, start, end),
+        status=206 if byte_range else 200,
+        content_type=content_type
+    )
+    if byte_range:
+        download_response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    download_response["Content-Length"] = str(end - start + 1)
+    download_response["Content-Disposition"] = f'attachment; filename="{_download_filename(url, content_type)}"'
+    download_response["Accept-Ranges"] = "bytes"
+    download_response["ETag"] = etag
+    return download_response
+
+async def proxy_download(request):
+    """
+    Async proxy_download for ASGI servers. Bodies are relayed chunk by chunk
+    with backpressure and never buffered, and a slow client holds no
+    thread, so one process can serve thousands of concurrent downloads.
+    Under WSGI the thread-based view is used.
+    """
+    if not isinstance(request, ASGIRequest):
+        return await sync_to_async(_proxy_download_sync)(request)
+
+    url = request.GET.get("url")
+    if not url:
+        return HttpResponse("Missing URL parameter", status=400)
+
+    cache_key = canonical_media_id(url)
+    etag = _media_etag(cache_key)
+    cached = disk_cache.get(cache_key)
+    if cached:
+        download_response = await _aserve_cached_download(request, url, cached, etag)
+        if download_response:
+            return download_response
+
+    # Bounds the wait for the upstream response; the body itself may stream for longer
+    deadline = Deadline(PROXY_DEADLINE)
+    try:
+        # Media is already compressed; asking for it as-is keeps the cached
+        # bytes, Content-Length and Range offsets all about the same body
+        headers = {'Accept-Encoding': 'identity'}
+        range_header = request.headers.get("Range")
+        if range_header and if_range_matches(request.headers.get("If-Range"), etag):
+            headers['Range'] = range_header
+
+        response = await deadline.wait_for(async_media_http.stream(url, deadline, headers=headers), "upstream request")
+        if response.status_code == 416 or response.is_error:
+            await response.aclose()
+            if response.status_code == 416:
+                return _range_not_satisfiable(response.headers.get("Content-Range", "bytes */*"))
+            response.raise_for_status()
+
+        content_type = response.headers.get("Content-Type", "application/octet-stream")
+        filename = _download_filename(url, content_type)
+
+        chunks = _astream_upstream(response)
+        # Raw bytes are relayed, so a body the CDN encoded anyway keeps its label
+        encoding = response.headers.get("Content-Encoding")
+        if response.status_code == 206 or encoding:
+            # A slice of the file, or encoded bytes a cache hit couldn't label: passed through but not cached
+            download_response = StreamingHttpResponse(chunks, status=response.status_code, content_type=content_type)
+            if response.status_code == 206:
+                download_response["Content-Range"] = response.headers.get("Content-Range")
+        else:
+            # Stream to the client and into the disk cache at the same time
+            download_response = StreamingHttpResponse(
+                _atee_to_cache(chunks, disk_cache.writer(cache_key, content_type)),
+                content_type=content_type
+            )
+        download_response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        download_response["ETag"] = etag
+        if response.status_code == 206 or response.headers.get("Accept-Ranges") == "bytes":
+            download_response["Accept-Ranges"] = "bytes"
+
+        if encoding:
+            download_response["Content-Encoding"] = encoding
+        content_length = response.headers.get("Content-Length")
+        if content_length:
+            download_response["Content-Length"] = content_length
+
+        return download_response
+
+    except (httpx.TimeoutException, DeadlineExceeded):
+        return HttpResponse("Download timeout - file may be too large", status=504)
+    except httpx.HTTPError as e:
+        logger.error(f"Proxy download error: {e}")
+        return HttpResponse("Failed to download media", status=500)
+    except Exception as e:
+        logger.error(f"Unexpected proxy download error: {e}")
+        return HttpResponse("Download error occurred", status=500)
+
 import io
 import zipfile
 import time
@@ -261,20 +815,19 @@ def download_all_zip(request):
     if len(urls) > 20:  # Limit to prevent abuse
         return HttpResponse("Too many files requested (max 20)", status=400)
 
+    deadline = Deadline(PROXY_DEADLINE)
     try:
         zip_buffer = io.BytesIO()
         successful_downloads = 0
         
         with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Referer': 'https://www.instagram.com/',
-            }
-            
             for i, url in enumerate(urls, 1):
+                if deadline.expired:
+                    logger.warning(f"ZIP deadline reached after {i - 1}/{len(urls)} files")
+                    break
                 try:
                     logger.info(f"Downloading file {i}/{len(urls)} for ZIP")
-                    response = requests.get(url, stream=True, headers=headers, timeout=30)
+                    response = media_http.get(url, deadline, stream=True)
                     response.raise_for_status()
                     
                     # Generate filename
@@ -300,7 +853,7 @@ def download_all_zip(request):
                         filename = f"{name}_{counter}.{ext}" if ext else f"{name}_{counter}"
                         counter += 1
                     
-                    zip_file.writestr(filename, response.content)
+                    zip_file.writestr(filename, b"".join(_read_within(response, deadline)))
                     successful_downloads += 1
                     
                 except Exception as e:
@@ -308,6 +861,8 @@ def download_all_zip(request):
                     continue
 
         if successful_downloads == 0:
+            if deadline.expired:
+                return HttpResponse("Request timeout", status=504)
             return HttpResponse("No files could be downloaded", status=500)
 
         zip_buffer.seek(0)
@@ -0,0 +1,145 @@
+import time
+import queue
+import threading
+import logging
+import multiprocessing
+from typing import Dict, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# This module is imported again inside each spawned worker, so it must not
+# touch Django settings - callers pass the configuration in.
+
+def _worker_main(conn, options: Dict):
+    """Worker process: import yt_dlp once and reuse one YoutubeDL (and its HTTP connections)"""
+    import yt_dlp
+
+    ydl = yt_dlp.YoutubeDL(options)
+    while True:
+        try:
+            url = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if url is None:
+            break
+
+        try:
+            info = ydl.extract_info(url, download=False)
+            conn.send(('ok', ydl.sanitize_info(info)))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+class YtDlpWorker:
+    """A long-lived yt-dlp process and the pipe used to talk to it"""
+
+    def __init__(self, context, options: Dict):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, options), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self):
+        """Ask the worker to exit, killing it if it doesn't"""
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+    def kill(self):
+        """Kill a hung worker"""
+        self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+class YtDlpPool:
+    """
+    Pool of warm yt-dlp worker processes fed over pipes.
+    Workers are spawned on first use, replaced after max_jobs extractions
+    and killed/replaced when a call exceeds its timeout.
+    """
+
+    def __init__(self, size: int, max_jobs: int, options: Optional[Dict] = None):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.options = options or {}
+        # spawn, not fork: forking a threaded web worker is unsafe
+        self.context = multiprocessing.get_context("spawn")
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.started = False
+        self.stats = {'jobs': 0, 'timeouts': 0, 'restarts': 0}
+
+    def start(self):
+        """Spawn the workers; they import yt_dlp in parallel in the background"""
+        with self.lock:
+            if self.started:
+                return
+            for _ in range(self.size):
+                self.idle.put(YtDlpWorker(self.context, self.options))
+            self.started = True
+            logger.info(f"Started {self.size} yt-dlp workers")
+
+    def _replace(self, worker: YtDlpWorker, hung: bool = False) -> YtDlpWorker:
+        if hung:
+            worker.kill()
+        else:
+            worker.stop()
+        with self.lock:
+            self.stats['restarts'] += 1
+        return YtDlpWorker(self.context, self.options)
+
+    def extract(self, url: str, timeout: float) -> Dict:
+        """Extract metadata for a URL (blocking). Raises TimeoutError or RuntimeError."""
+        self.start()
+        # One budget: time spent waiting for a worker comes out of the extraction's
+        give_up_at = time.monotonic() + timeout
+        try:
+            worker = self.idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No yt-dlp worker available")
+
+        remaining = give_up_at - time.monotonic()
+        if remaining <= 0:
+            self.idle.put(worker)
+            raise TimeoutError("No yt-dlp worker available")
+
+        try:
+            worker.conn.send(url)
+            if not worker.conn.poll(remaining):
+                with self.lock:
+                    self.stats['timeouts'] += 1
+                worker = self._replace(worker, hung=True)
+                raise TimeoutError(f"yt-dlp timed out after {timeout}s")
+
+            status, payload = worker.conn.recv()
+            worker.jobs += 1
+            with self.lock:
+                self.stats['jobs'] += 1
+            if worker.jobs >= self.max_jobs:
+                worker = self._replace(worker)
+        except TimeoutError:
+            raise
+        except (EOFError, BrokenPipeError, OSError) as e:
+            logger.error(f"yt-dlp worker died: {e}")
+            worker = self._replace(worker, hung=True)
+            raise RuntimeError("Video extractor crashed")
+        finally:
+            self.idle.put(worker)
+
+        if status != 'ok':
+            raise RuntimeError(payload)
+        return payload
+
+    def shutdown(self):
+        """Stop every idle worker"""
+        with self.lock:
+            while not self.idle.empty():
+                self.idle.get_nowait().stop()
+            self.started = False
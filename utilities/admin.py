@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ContactMessage,BlogPost, BlogCategory
+from .models import ContactMessage,BlogPost, BlogCategory, MediaMetadata
 
 @admin.register(ContactMessage)
 class ContactAdmin(admin.ModelAdmin):
@@ -17,4 +17,11 @@ class BlogPostAdmin(admin.ModelAdmin):
         models.TextField: {'widget': TinyMCE(attrs={'cols': 80, 'rows': 30})},
     }
 
-admin.site.register(BlogCategory)
\ No newline at end of file
+admin.site.register(BlogCategory)
+
+
+@admin.register(MediaMetadata)
+class MediaMetadataAdmin(admin.ModelAdmin):
+    list_display = ('key', 'platform', 'typename', 'fetched_at', 'expires_at')
+    list_filter = ('platform',)
+    search_fields = ('key',)
@@ -1,6 +1,30 @@
+import os
+import sys
 from django.apps import AppConfig
+from django.conf import settings
+
+# Entry points that serve requests; anything else (tests, celery, django-admin) never warms up
+SERVER_COMMANDS = ("gunicorn", "uvicorn", "daphne", "hypercorn")
 
 
 class UtilitiesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "utilities"
+
+    def ready(self):
+        if not getattr(settings, "INSTAGRAM_WARM_UP_ON_STARTUP", False) or not self._is_server_process():
+            return
+
+        # Imported here: the session manager needs the app registry to be ready
+        from instander.insta_login import start_instagram_warm_up
+        start_instagram_warm_up()
+
+    def _is_server_process(self) -> bool:
+        """Only ASGI/WSGI servers and runserver's serving child warm up"""
+        if os.path.basename(sys.argv[0]) == "manage.py":
+            if sys.argv[1:2] != ["runserver"]:
+                return False
+            return os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
+        # `gunicorn ...` or `python -m uvicorn ...` (argv[0] is .../uvicorn/__main__.py)
+        command = os.path.normpath(sys.argv[0]).split(os.sep)
+        return any(part in SERVER_COMMANDS for part in command[-2:])
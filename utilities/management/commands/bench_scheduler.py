@@ -0,0 +1,47 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from instander.scheduler import AccountScheduler
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark account checkout: heap scheduler vs a linear scan over all accounts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+        parser.add_argument("--checkouts", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        for size in options["sizes"]:
+            heap = self._bench_heap(size, options["checkouts"])
+            linear = self._bench_linear(size, options["checkouts"])
+            self.stdout.write(
+                f"{size:>5} accounts: heap {heap:6.2f} us/checkout, "
+                f"linear {linear:7.2f} us/checkout ({linear / heap:.1f}x)"
+            )
+
+    def _bench_heap(self, size, checkouts):
+        # No rate limit in the way, so every pass measures a full checkout + return
+        scheduler = AccountScheduler(limit=checkouts, window=3600, min_interval=0)
+        now = time.time()
+        for i in range(size):
+            scheduler.add(f"account{i}", now)
+
+        started = time.perf_counter()
+        for _ in range(checkouts):
+            username = scheduler.pop_ready(now)
+            scheduler.record_use(username, now)
+            scheduler.add(username, now)
+        return (time.perf_counter() - started) / checkouts * 1e6
+
+    def _bench_linear(self, size, checkouts):
+        # What checkout used to do: filter every account, then take the least used
+        accounts = {f"account{i}": {'active': True, 'request_count': random.randint(0, 10)} for i in range(size)}
+        leased = set()
+
+        started = time.perf_counter()
+        for _ in range(checkouts):
+            candidates = [u for u, status in accounts.items() if status['active'] and u not in leased]
+            username = min(candidates, key=lambda u: accounts[u]['request_count'])
+            accounts[username]['request_count'] += 1
+        return (time.perf_counter() - started) / checkouts * 1e6
@@ -0,0 +1,59 @@
+import statistics
+import subprocess
+import time
+from django.core.management.base import BaseCommand
+from instander.ytdlp_pool import YtDlpPool
+
+
+class Command(BaseCommand):
+    help = "Compare cold (subprocess per request) and warm (worker pool) yt-dlp extraction latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="Video URL to extract")
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--timeout", type=float, default=60)
+
+    def handle(self, *args, **options):
+        url, runs, timeout = options["url"], options["runs"], options["timeout"]
+
+        cold = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(
+                ["yt-dlp", "--no-playlist", "--quiet", "--dump-json", "--socket-timeout", "30", url],
+                capture_output=True, timeout=timeout
+            )
+            cold.append(time.perf_counter() - started)
+
+        pool = YtDlpPool(size=1, max_jobs=runs + 1, options={'quiet': True, 'no_warnings': True, 'noplaylist': True, 'socket_timeout': 30})
+        warm = []
+        try:
+            # First call pays process start and imports; measured separately
+            started = time.perf_counter()
+            self._extract(pool, url, timeout)
+            first = time.perf_counter() - started
+
+            for _ in range(runs):
+                started = time.perf_counter()
+                self._extract(pool, url, timeout)
+                warm.append(time.perf_counter() - started)
+        finally:
+            pool.shutdown()
+
+        self.stdout.write(f"cold subprocess: {self._summary(cold)}")
+        self.stdout.write(f"pool first call: {first * 1000:.0f} ms")
+        self.stdout.write(f"warm pool:       {self._summary(warm)}")
+
+    def _extract(self, pool, url, timeout):
+        try:
+            pool.extract(url, timeout)
+        except RuntimeError:
+            # Extraction errors still exercise the full warm path
+            pass
+
+    def _summary(self, samples):
+        return (
+            f"mean {statistics.mean(samples) * 1000:.0f} ms, "
+            f"median {statistics.median(samples) * 1000:.0f} ms, "
+            f"max {max(samples) * 1000:.0f} ms over {len(samples)} runs"
+        )
@@ -0,0 +1,48 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from instander.insta_login import SESSION_DIR, get_session_manager
+from instander.login_worker import BrowserLoginWorker
+
+
+class Command(BaseCommand):
+    help = "Run the Selenium login worker: one reused browser, one queued Instagram login at a time"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll-interval", type=float, default=1)
+
+    def handle(self, *args, **options):
+        manager = get_session_manager()
+        queue = manager.login_queue
+        queue.requeue_stale()
+
+        worker = BrowserLoginWorker(
+            SESSION_DIR,
+            max_logins=getattr(settings, "INSTAGRAM_LOGIN_WORKER_MAX_LOGINS", 20),
+            max_rss_mb=getattr(settings, "INSTAGRAM_LOGIN_WORKER_MAX_RSS_MB", 600),
+            idle_seconds=getattr(settings, "INSTAGRAM_LOGIN_WORKER_IDLE_SECONDS", 300),
+        )
+        self.stdout.write("Login worker waiting for jobs")
+
+        try:
+            while True:
+                username = queue.claim()
+                if username is None:
+                    worker.close_if_idle()
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                # Re-read every time so credential changes don't need a restart
+                account = next((acc for acc in manager.load_accounts() if acc.get("username") == username), None)
+                if not account or not account.get("password"):
+                    queue.finish(username, ok=False, error="Unknown account")
+                    continue
+
+                started = time.monotonic()
+                ok = worker.login(username, account["password"])
+                queue.finish(username, ok=ok, error=None if ok else "Browser login failed")
+                self.stdout.write(f"{username}: {'ok' if ok else 'failed'} in {time.monotonic() - started:.1f}s")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.stop()
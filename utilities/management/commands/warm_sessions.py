@@ -0,0 +1,27 @@
+import time
+from django.core.management.base import BaseCommand
+from instander.insta_login import get_session_manager
+
+
+class Command(BaseCommand):
+    help = "Log every Instagram account in (in parallel) and report when each becomes usable"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--timeout", type=float, default=600, help="Give up waiting after this many seconds")
+
+    def handle(self, *args, **options):
+        manager = get_session_manager()
+        started = time.monotonic()
+        manager.start_warm_up()
+
+        if manager.ready_event.wait(options["timeout"]) and manager.readiness()["ready"]:
+            self.stdout.write(f"first account ready after {time.monotonic() - started:.1f}s")
+
+        manager.warm_up_thread.join(max(0, options["timeout"] - (time.monotonic() - started)))
+        readiness = manager.readiness()
+        self.stdout.write(
+            f"{readiness['accounts_joined']}/{readiness['accounts_total']} accounts ready "
+            f"after {time.monotonic() - started:.1f}s"
+        )
+        if not readiness["ready"]:
+            self.stderr.write("No Instagram accounts could be logged in")
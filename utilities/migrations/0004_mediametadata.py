@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("utilities", "0003_rename_submitted_at_contactmessage_created_at_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaMetadata",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=255, unique=True)),
+                ("platform", models.CharField(choices=[("instagram", "Instagram"), ("facebook", "Facebook")], max_length=20)),
+                ("typename", models.CharField(blank=True, max_length=50)),
+                ("media", models.JSONField()),
+                ("thumbnail", models.URLField(blank=True, max_length=2000, null=True)),
+                ("fetched_at", models.DateTimeField(db_index=True)),
+                ("expires_at", models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["platform", "fetched_at"], name="utilities_m_platfor_2ef249_idx")],
+            },
+        ),
+    ]
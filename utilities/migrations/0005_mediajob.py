@@ -0,0 +1,30 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:44
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("utilities", "0004_mediametadata"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaJob",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("url", models.URLField(max_length=2000)),
+                ("expected_type", models.CharField(max_length=20)),
+                ("is_staff", models.BooleanField(default=False)),
+                ("status", models.CharField(choices=[("pending", "Pending"), ("running", "Running"), ("done", "Done")], default="pending", max_length=20)),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["status", "updated_at"], name="utilities_m_status_3b6aa7_idx")],
+            },
+        ),
+    ]
@@ -16,6 +16,7 @@ class ContactMessage(models.Model):
 
 from django.db import models
 from tinymce.models import HTMLField
+import uuid
 
 class BlogCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -35,3 +36,54 @@ class BlogPost(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class MediaMetadata(models.Model):
+    PLATFORM_CHOICES = [
+        ('instagram', 'Instagram'),
+        ('facebook', 'Facebook'),
+    ]
+
+    key = models.CharField(max_length=255, unique=True)
+    platform = models.CharField(max_length=20, choices=PLATFORM_CHOICES)
+    typename = models.CharField(max_length=50, blank=True)
+    media = models.JSONField()
+    thumbnail = models.URLField(max_length=2000, null=True, blank=True)
+    fetched_at = models.DateTimeField(db_index=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['platform', 'fetched_at']),
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class MediaJob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    url = models.URLField(max_length=2000)
+    expected_type = models.CharField(max_length=20)
+    is_staff = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.expected_type} job {self.id} ({self.status})"
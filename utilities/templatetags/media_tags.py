@@ -0,0 +1,17 @@
+from django import template
+from django.urls import reverse
+from django.utils.http import urlencode
+from instander.image_variants import VARIANT_WIDTHS
+
+register = template.Library()
+
+@register.simple_tag
+def proxy_image_url(url, width=None):
+    params = {'url': url}
+    if width:
+        params['w'] = width
+    return f"{reverse('proxy_image')}?{urlencode(params)}"
+
+@register.simple_tag
+def proxy_image_srcset(url):
+    return ", ".join(f"{proxy_image_url(url, width)} {width}w" for width in VARIANT_WIDTHS)
@@ -1,3 +1,73 @@
+from unittest import mock
+
+import instaloader
 from django.test import TestCase
 
-# Create your tests here.
+from instander import downloader
+from instander.disk_cache import canonical_media_id
+from instander.exceptions import MediaUnavailableError
+from instander.insta_login import MISSING_POST_MESSAGE, SessionLease
+from instander.media_cache import negative_cache
+from instander.scheduler import AccountScheduler
+
+
+class CanonicalMediaIdTests(TestCase):
+    def test_cdn_links_to_same_file_share_a_key(self):
+        a = canonical_media_id("https://scontent-a.cdninstagram.com/v/t51/123.jpg?stp=dst-jpg&oh=1&oe=2")
+        b = canonical_media_id("https://scontent-b.cdninstagram.com/v/t51/123.jpg?stp=dst-jpg&oh=3&oe=4")
+        self.assertEqual(a, b)
+
+    def test_lookalike_host_does_not_share_the_cdn_key(self):
+        real = canonical_media_id("https://scontent.cdninstagram.com/v/t51/123.jpg?stp=dst-jpg")
+        for host in ("evilcdninstagram.com", "xfbcdn.net", "cdninstagram.com.evil.net"):
+            with self.subTest(host=host):
+                fake = canonical_media_id(f"https://{host}/v/t51/123.jpg?stp=dst-jpg")
+                self.assertNotEqual(real, fake)
+
+
+class DeadInstagramLinkTests(TestCase):
+    url = "https://www.instagram.com/p/DEADPOST123/"
+
+    def setUp(self):
+        negative_cache.delete(downloader.media_cache_key(self.url))
+        self.manager = mock.Mock()
+        session = mock.Mock()
+        session.context.username = "account1"
+        self.lease = SessionLease(self.manager, "account1", session)
+
+    def fetch_missing_post(self):
+        missing = instaloader.exceptions.BadResponseException(MISSING_POST_MESSAGE)
+        with mock.patch.object(downloader, "acquire_instagram_session", mock.AsyncMock(return_value=self.lease)), \
+                mock.patch.object(downloader.random, "uniform", return_value=0), \
+                mock.patch.object(instaloader.Post, "from_shortcode", side_effect=missing) as from_shortcode:
+            for _ in range(2):
+                with self.assertRaises(MediaUnavailableError) as raised:
+                    downloader.fetch_instagram_media(self.url)
+                self.assertEqual(raised.exception.reason, MediaUnavailableError.NOT_FOUND)
+        return from_shortcode
+
+    def test_missing_post_is_negative_cached_and_not_retried(self):
+        from_shortcode = self.fetch_missing_post()
+        # One upstream fetch: no retries, and the second request hits the negative cache
+        self.assertEqual(from_shortcode.call_count, 1)
+        self.assertIsNotNone(downloader.get_cached_failure(self.url))
+
+    def test_missing_post_does_not_count_against_the_account(self):
+        self.fetch_missing_post()
+        self.manager.release.assert_called_once_with("account1", success=True, failure=None)
+
+
+class AccountSchedulerTests(TestCase):
+    def test_fleet_refreshes_keep_the_heap_bounded(self):
+        scheduler = AccountScheduler(limit=150, window=3600, min_interval=3)
+        accounts = [f"account{i}" for i in range(100)]
+        for username in accounts:
+            scheduler.add(username, 0.0)
+
+        # A day of keepalive ticks on a worker that never checks an account out
+        for tick in range(8640):
+            scheduler.update_fleet({username: (150, 0.0) for username in accounts}, tick * 10.0)
+
+        self.assertEqual(len(scheduler), 100)
+        self.assertLessEqual(len(scheduler.heap), 2 * len(scheduler))
+        self.assertIsNotNone(scheduler.pop_ready(86400.0))